@@ -18,8 +18,9 @@ import cgi
 import flask
 import os
 import time
-import uuid
 
+from pyhole.core import history
+from pyhole.core import pastes
 from pyhole.core import queue
 from pyhole.core import request
 from pyhole.core import utils
@@ -27,7 +28,8 @@ from pyhole.core import version
 
 
 APP = flask.Flask("pyhole")
-QUEUE = queue.MessageQueue()
+RENDERED_PASTES = pastes.RenderCache(utils.get_config().get(
+    "paste_cache_bytes", type="int", default=16777216))
 
 
 @APP.route("/", methods=["GET"])
@@ -52,12 +54,35 @@ def send_message():
         flask.abort(422)
 
     # NOTE(jk0): Disable until auth is implemented.
-    # QUEUE.put(item)
+    # queue.get_broker().put(item)
 
     return str(item), 200
 # END MESSAGE API #
 
 
+# BEGIN HISTORY API #
+@APP.route("/history/<network>", methods=["GET"])
+def get_history(network):
+    """Search the chat history of a network."""
+    # NOTE(agent): Disabled unless enabled, until auth is implemented.
+    if not utils.get_config().get("api_history_enabled", type="bool",
+                                  default=False):
+        flask.abort(404)
+
+    limit = max(1, min(flask.request.args.get("limit", 10, type=int), 100))
+    query = flask.request.args.get("q")
+    channel = flask.request.args.get("channel")
+
+    if query:
+        rows = history.get_index().search(network, query, limit, channel)
+    else:
+        rows = history.get_index().last(network, limit, channel)
+
+    return flask.jsonify(history=[{"created": created, "line": line}
+                                  for created, line in rows])
+# END HISTORY API #
+
+
 # BEGIN PAGERDUTY API #
 pagerduty = utils.get_config("PagerDuty")
 api_token = pagerduty.get("api_token")
@@ -121,25 +146,91 @@ def get_notes(incident_id):
 @APP.route("/pastes/<paste_id>/<raw>", methods=["GET"])
 def get_paste(paste_id, raw=None):
     """Fetch and return a paste."""
-    stats = os.stat(utils.get_directory("pastes") + paste_id)
-    st_mtime = time.ctime(stats.st_mtime)
-    st_size = stats.st_size
+    store = pastes.get_store()
+    record = store.lookup(paste_id)
 
-    paste = utils.read_file("pastes", paste_id)
-
-    if not paste:
+    if not record:
         flask.abort(404)
 
-    if raw:
-        return flask.Response(paste, status=200, mimetype="text/plain")
+    store.touch(paste_id)
 
-    return flask.render_template(
-        "paste.html",
-        paste_id=paste_id,
-        paste=cgi.escape(paste),
-        st_mtime=st_mtime,
-        st_size=st_size,
-        version=version.version_string())
+    if raw:
+        return _send_raw_paste(store, record)
+
+    # NOTE(agent): The page changes with the template, so an upgrade has to
+    # change the ETag as well.
+    etag = "%s-html-%s" % (record["digest"], version.version_hash())
+    if flask.request.if_none_match.contains_weak(etag):
+        return _not_modified(etag)
+
+    page = RENDERED_PASTES.get(paste_id)
+    if page is None:
+        page = flask.render_template(
+            "paste.html",
+            paste_id=paste_id,
+            paste=cgi.escape(store.read(record)),
+            st_mtime=time.ctime(record["created"]),
+            st_size=record["size"],
+            version=version.version_string())
+        RENDERED_PASTES.put(paste_id, page)
+
+    response = flask.make_response(page)
+    response.set_etag(etag)
+    return response
+
+
+def _send_raw_paste(store, record):
+    """Stream a paste as plain text.  Clients that accept gzip get the
+    stored blob as is, everyone else gets it decompressed on the fly.
+    """
+    etag = record["digest"]
+    gzip_etag = "%s-gz" % etag
+    if_none_match = flask.request.if_none_match
+    if if_none_match.contains_weak(etag):
+        return _not_modified(etag)
+    if if_none_match.contains_weak(gzip_etag):
+        return _not_modified(gzip_etag)
+
+    size = record["size"]
+    byte_range = flask.request.range
+
+    # NOTE(agent): Multiple ranges would need a multipart response; the
+    # whole paste is sent instead, as RFC 7233 allows.
+    if byte_range and len(byte_range.ranges) == 1:
+        bounds = byte_range.range_for_length(size)
+        if bounds is None:
+            response = flask.Response(status=416)
+            response.headers["Content-Range"] = "bytes */%d" % size
+            return response
+
+        start, stop = bounds
+        response = flask.Response(store.stream(record, start, stop),
+                                  status=206, mimetype="text/plain")
+        response.headers["Content-Range"] = byte_range.make_content_range(
+            size).to_header()
+        response.content_length = stop - start
+        response.set_etag(etag)
+    elif flask.request.accept_encodings["gzip"]:
+        response = flask.send_file(store.object_path(etag),
+                                   mimetype="text/plain", add_etags=False,
+                                   conditional=False)
+        response.headers["Content-Encoding"] = "gzip"
+        response.set_etag(gzip_etag)
+    else:
+        response = flask.Response(store.stream(record), mimetype="text/plain")
+        response.content_length = size
+        response.set_etag(etag)
+
+    response.headers["Accept-Ranges"] = "bytes"
+    response.vary.add("Accept-Encoding")
+    return response
+
+
+def _not_modified(etag):
+    """Tell the client its copy is still good."""
+    response = flask.Response(status=304)
+    response.set_etag(etag)
+    return response
 
 
 @APP.route("/pastes", methods=["POST"])
@@ -150,8 +241,7 @@ def create_paste():
     except KeyError:
         flask.abort(422)
 
-    file_name = str(uuid.uuid4()).replace("-", "")
-    utils.write_file("pastes", file_name, paste)
+    file_name = pastes.get_store().create(paste)
 
     response = "%s/%s" % (flask.request.url, file_name)
 
@@ -163,7 +253,7 @@ def create_paste():
             response
         )
 
-        QUEUE.put(item)
+        queue.get_broker().put(item)
     except KeyError:
         pass
 
@@ -171,7 +261,7 @@ def create_paste():
 # END PASTE API #
 
 
-@utils.spawn
+@utils.spawn_thread
 def run():
     """Run the flask process."""
     config = utils.get_config()
@@ -187,4 +277,6 @@ def run():
     if os.path.exists(ssl_crt) and os.path.exists(ssl_key):
         kwargs["ssl_context"] = (ssl_crt, ssl_key)
 
+    pastes.run_compactor(RENDERED_PASTES.discard)
+
     APP.run(**kwargs)
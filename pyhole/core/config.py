@@ -15,27 +15,110 @@
 """Pyhole Configuration Manager"""
 
 import ConfigParser
+import copy
 import os
+import signal
 import sys
+import threading
+import time
 
 import utils
 
 
+# NOTE(agent): How often, in seconds, to check whether the file has changed.
+CHECK_INTERVAL = 1.0
+
+_parsers = {}
+_views = {}
+_lock = threading.Lock()
+_generation = 0
+
+
+class _Parsed(object):
+    """A parsed configuration file and the values looked up from it."""
+
+    def __init__(self, path):
+        self.path = path
+        self.generation = _generation
+        self.mtime = _mtime(path)
+        self.checked = time.time()
+        self.parser = ConfigParser.ConfigParser()
+        self.values = {}
+
+        for _i in range(0, 2):
+            try:
+                with open(path) as conf_file:
+                    self.parser.readfp(conf_file)
+                break
+            except IOError:
+                print "Unable to load configuration file: %s" % path
+                utils.prepare_config()
+
+
+def _mtime(path):
+    """Return the modification time of a file, or None if it's missing."""
+    try:
+        return os.path.getmtime(path)
+    except OSError:
+        return None
+
+
+def _get_parsed(path):
+    """Return the parsed file, re-reading it if it has changed on disk."""
+    with _lock:
+        parsed = _parsers.get(path)
+        now = time.time()
+
+        if parsed and parsed.generation != _generation:
+            parsed = None
+
+        if parsed and now - parsed.checked < CHECK_INTERVAL:
+            return parsed
+
+        if parsed and _mtime(path) == parsed.mtime:
+            parsed.checked = now
+            return parsed
+
+        parsed = _parsers[path] = _Parsed(path)
+        return parsed
+
+
+def reload(*_args):
+    """Forget every parsed file so the next lookup reads them again."""
+    global _generation
+
+    # NOTE(agent): This runs as a signal handler, possibly while this very
+    # thread holds _lock, so it must not take it.
+    _generation += 1
+
+
+def install_reload_handler(handler=reload):
+    """Reload the configuration on SIGHUP."""
+    signal.signal(signal.SIGHUP, handler)
+
+
+def get_config(path, section):
+    """Return the cached configuration object for a section of a file."""
+    key = (path, section)
+    view = _views.get(key)
+    if view is None:
+        view = _views.setdefault(key, Config(path, section))
+    return view
+
+
 class Config(object):
     """A configuration object."""
 
     def __init__(self, config, section):
         self.config = os.path.abspath(config)
-        self.config_parser = ConfigParser.ConfigParser()
         self.section = section
 
-        for _i in range(0, 2):
-            try:
-                with open(self.config) as conf_file:
-                    self.config_parser.readfp(conf_file)
-            except IOError:
-                print "Unable to load configuration file: %s" % self.config
-                utils.prepare_config()
+        _get_parsed(self.config)
+
+    @property
+    def config_parser(self):
+        """Return the parser, re-reading the file if it has changed."""
+        return _get_parsed(self.config).parser
 
     def __str__(self):
         """Make the config object readable for logging."""
@@ -48,21 +131,39 @@ class Config(object):
     def get(self, option, **kwargs):
         """Retrieve configuration values."""
         _type = kwargs.get("type", "str")
+        parsed = _get_parsed(self.config)
+        key = (self.section, option, _type)
 
         try:
-            if _type == "int":
-                return self.config_parser.getint(self.section, option)
-            elif _type == "bool":
-                return self.config_parser.getboolean(self.section, option)
-            elif _type == "list":
-                return self.config_parser.get(self.section, option).split(", ")
-            else:
-                return self.config_parser.get(self.section, option)
-        except ConfigParser.NoOptionError:
-            if "default" in kwargs:
-                return kwargs["default"]
-
-            print "Unable to locate '%s' in %s" % (option, self.config)
-            print "[%s]" % self.section
-            print "%s: value" % option
-            sys.exit(1)
+            value = parsed.values[key]
+        except KeyError:
+            try:
+                value = self._get(parsed.parser, option, _type)
+            except ConfigParser.NoOptionError:
+                if "default" in kwargs:
+                    return kwargs["default"]
+
+                print "Unable to locate '%s' in %s" % (option, self.config)
+                print "[%s]" % self.section
+                print "%s: value" % option
+                sys.exit(1)
+
+            parsed.values[key] = value
+
+        # NOTE(agent): Callers are free to change the lists they get back.
+        if _type == "list":
+            return copy.copy(value)
+        return value
+
+    def _get(self, config_parser, option, _type):
+        """Parse a value from the file."""
+        if _type == "int":
+            return config_parser.getint(self.section, option)
+        elif _type == "float":
+            return config_parser.getfloat(self.section, option)
+        elif _type == "bool":
+            return config_parser.getboolean(self.section, option)
+        elif _type == "list":
+            return config_parser.get(self.section, option).split(", ")
+        else:
+            return config_parser.get(self.section, option)
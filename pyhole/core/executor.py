@@ -0,0 +1,424 @@
+#   Copyright 2026 agent
+#
+#   Licensed under the Apache License, Version 2.0 (the "License");
+#   you may not use this file except in compliance with the License.
+#   You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS,
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#   See the License for the specific language governing permissions and
+#   limitations under the License.
+
+"""Pyhole Worker Pools"""
+
+import collections
+import functools
+import logging
+import os
+import Queue
+import threading
+import time
+
+import utils
+
+
+POLICIES = ("drop", "reject", "block")
+WATCHDOG_INTERVAL = 0.5
+
+_executors = {}
+_executors_lock = threading.Lock()
+
+_local = threading.local()
+_watched = set()
+_watched_lock = threading.Lock()
+_watchdog_pid = None
+
+
+class Deadline(object):
+    """A time limit for a single hook invocation.  Every call the hook hands
+    to the worker pool shares it, and long running plugins can check
+    cancelled() to stop early.  Replies sent under a priority deadline
+    jump the outgoing queue.
+    """
+
+    def __init__(self, name, timeout, message=None, reply=False, log=None,
+                 priority=False):
+        self.name = name
+        self.timeout = timeout
+        self.message = message
+        self.reply = reply
+        self.priority = priority
+        self.log = log or logging.getLogger()
+        self.started = time.time()
+        self.expires = self.started + timeout if timeout else None
+
+        self._cancelled = threading.Event()
+        self._lock = threading.Lock()
+
+    def remaining(self):
+        """Seconds left before the deadline, or None if there is none."""
+        if self.expires is None:
+            return None
+        return max(self.expires - time.time(), 0)
+
+    def expired(self):
+        """Return whether the deadline has passed."""
+        return self.expires is not None and time.time() >= self.expires
+
+    def cancelled(self):
+        """Return whether the hook should stop what it is doing."""
+        return self._cancelled.is_set() or self.expired()
+
+    def cancel(self):
+        """Cancel the hook.  Returns True only for the first caller."""
+        with self._lock:
+            if self._cancelled.is_set():
+                return False
+            self._cancelled.set()
+            return True
+
+    def timed_out(self):
+        """Cancel the hook, then log and optionally tell the user."""
+        if not self.cancel():
+            return
+
+        self.log.warning("%s timed out after %.1f seconds" % (
+                         self.name, time.time() - self.started))
+        if self.reply and self.message:
+            self.message.dispatch("Sorry, %s timed out." % self.name)
+
+
+class _Watch(object):
+    """A running call being watched for its deadline."""
+
+    def __init__(self, deadline, on_timeout):
+        self.deadline = deadline
+        self.on_timeout = on_timeout
+        self.state = "running"
+        self.lock = threading.Lock()
+
+
+def current_deadline():
+    """Return the deadline of the hook running in this thread, if any."""
+    return getattr(_local, "deadline", None)
+
+
+def set_deadline(deadline):
+    """Set the deadline of the hook running in this thread."""
+    _local.deadline = deadline
+
+
+def run_call(func, args, kwargs, deadline, log, on_timeout=None):
+    """Run a call under its deadline.  Returns False if the call overran
+    the deadline and on_timeout already gave its slot to someone else.
+    """
+    if deadline and deadline.cancelled():
+        log.warning("%s timed out before it could run" % func.__name__)
+        deadline.timed_out()
+        return True
+
+    watch = None
+    if deadline and deadline.expires is not None:
+        watch = _Watch(deadline, on_timeout)
+        _start_watching(watch)
+
+    previous = current_deadline()
+    _local.deadline = deadline
+    try:
+        func(*args, **kwargs)
+    except Exception, exc:
+        log.exception(exc)
+    finally:
+        _local.deadline = previous
+
+    if not watch:
+        return True
+
+    with _watched_lock:
+        _watched.discard(watch)
+
+    with watch.lock:
+        if watch.state == "running":
+            watch.state = "done"
+            return True
+
+    _local.abandoned = True
+    return False
+
+
+def _start_watching(watch):
+    """Track a running call, starting the watchdog if needed."""
+    global _watchdog_pid
+
+    with _watched_lock:
+        _watched.add(watch)
+
+        if _watchdog_pid != os.getpid():
+            t = threading.Thread(target=_watchdog, name="watchdog")
+            t.setDaemon(True)
+            t.start()
+            _watchdog_pid = os.getpid()
+
+
+def _watchdog():
+    """Cancel calls that overrun their deadline and free their slots."""
+    while True:
+        time.sleep(WATCHDOG_INTERVAL)
+
+        now = time.time()
+        with _watched_lock:
+            expired = [x for x in _watched if x.deadline.expires <= now]
+            _watched.difference_update(expired)
+
+        for watch in expired:
+            with watch.lock:
+                if watch.state != "running":
+                    continue
+                watch.state = "timed_out"
+
+            watch.deadline.timed_out()
+            if watch.on_timeout:
+                try:
+                    watch.on_timeout()
+                except Exception, exc:
+                    watch.deadline.log.exception(exc)
+
+
+class Executor(object):
+    """A bounded pool of worker threads fed by a bounded queue.
+
+    When the queue is full, the saturation policy decides what happens to
+    new work: "drop" and "reject" refuse it (the caller decides whether to
+    tell the user), "block" makes the caller wait for room.
+
+    A worker stuck on a timed out call is replaced, but only while there
+    are no more stuck workers than workers.  Past that, the pool runs short
+    until a stuck worker comes back and takes up work again.
+    """
+
+    def __init__(self, name, workers=8, queue_size=64, policy="drop"):
+        self.name = name
+        self.workers = workers
+        self.queue_size = queue_size
+        self.policy = policy if policy in POLICIES else "drop"
+        self.log = logging.getLogger(name)
+        self.dropped = 0
+
+        self._lock = threading.Lock()
+        self._pid = None
+        self._queue = None
+        self._threads = []
+        self._stuck = 0
+        self._missing = 0
+
+    def _ensure_started(self):
+        """Start the workers, once per process."""
+        if self._pid == os.getpid():
+            return
+
+        with self._lock:
+            if self._pid == os.getpid():
+                return
+
+            # NOTE(agent): Threads do not survive a fork, so a pool that was
+            # created in the parent process has to be rebuilt in the child.
+            self._queue = Queue.Queue(self.queue_size)
+            self._threads = []
+            self._stuck = 0
+            self._missing = 0
+            for _i in range(self.workers):
+                self._add_worker()
+
+            self._pid = os.getpid()
+
+    def _add_worker(self):
+        """Start a worker thread."""
+        t = threading.Thread(target=self._work, name="%s-worker-%d" % (
+                             self.name, len(self._threads)))
+        t.setDaemon(True)
+        t.start()
+        self._threads.append(t)
+
+    def _replace_worker(self):
+        """Start a replacement for a worker stuck on a timed out call."""
+        with self._lock:
+            self._stuck += 1
+            if self._stuck > self.workers:
+                self._missing += 1
+                self.log.warning("%d workers are stuck on timed out calls, "
+                                 "not replacing another" % self._stuck)
+                return
+            self._add_worker()
+
+    def _work(self):
+        """Run queued calls until the process exits or until this worker
+        is stuck on a timed out call and has been replaced.
+        """
+        while True:
+            func, args, kwargs, deadline = self._queue.get()
+            try:
+                run_call(func, args, kwargs, deadline, self.log,
+                         self._replace_worker)
+            finally:
+                self._queue.task_done()
+
+            if getattr(_local, "abandoned", False):
+                _local.abandoned = False
+                with self._lock:
+                    self._stuck -= 1
+                    if self._missing:
+                        # NOTE(agent): This worker was never replaced, so
+                        # it goes back to work.
+                        self._missing -= 1
+                        continue
+                    self._threads.remove(threading.current_thread())
+                return
+
+    def submit(self, func, *args, **kwargs):
+        """Queue a call under the current hook's deadline.  Returns False if
+        the call was refused.
+        """
+        return self._put((func, args, kwargs, current_deadline()))
+
+    def _put(self, item, block=None):
+        """Place an item in the queue, following the saturation policy."""
+        self._ensure_started()
+
+        if block is None:
+            block = self.policy == "block"
+
+        if block:
+            self._queue.put(item)
+            return True
+
+        try:
+            self._queue.put_nowait(item)
+            return True
+        except Queue.Full:
+            self.dropped += 1
+            self.log.warning("Worker pool saturated, refused %s (%d refused)"
+                             % (item[0].__name__, self.dropped))
+            return False
+
+    def stats(self):
+        """Return the current pool statistics."""
+        return {
+            "workers": self.workers,
+            "stuck": self._stuck,
+            "queued": self._queue.qsize() if self._queue else 0,
+            "queue_size": self.queue_size,
+            "dropped": self.dropped
+        }
+
+
+class Bulkhead(object):
+    """Limit how many calls a single plugin may run in the worker pool at
+    once.  Calls over the limit wait in the plugin's own backlog and are
+    shed once that is full, so one slow plugin can't starve the others.
+    """
+
+    def __init__(self, name, limit=4, backlog=16, log=None):
+        self.name = name
+        self.limit = limit
+        self.backlog = backlog
+        self.log = log or logging.getLogger()
+        self.active = 0
+        self.shed = 0
+
+        self._lock = threading.Lock()
+        self._waiting = collections.deque()
+
+    def submit(self, pool, func, *args, **kwargs):
+        """Queue a call under the current hook's deadline.  Returns False if
+        the call was refused.
+        """
+        item = (pool, func, args, kwargs, current_deadline())
+
+        with self._lock:
+            if self.active >= self.limit:
+                if len(self._waiting) < self.backlog:
+                    self._waiting.append(item)
+                    return True
+
+                self.shed += 1
+                self.log.warning("%s is at its concurrency limit, shed %s "
+                                 "(%d shed)" % (self.name, func.__name__,
+                                                self.shed))
+                return False
+
+            self.active += 1
+
+        if not pool._put((self._run, item, {}, None)):
+            with self._lock:
+                self.active -= 1
+            return False
+
+        return True
+
+    def _run(self, pool, func, args, kwargs, deadline):
+        """Run a call, then keep draining the backlog in the same worker."""
+        while True:
+            on_timeout = functools.partial(self._abandon, pool)
+            if not run_call(func, args, kwargs, deadline, self.log,
+                            on_timeout):
+                return
+
+            with self._lock:
+                if not self._waiting:
+                    self.active -= 1
+                    return
+                pool, func, args, kwargs, deadline = self._waiting.popleft()
+
+    def _abandon(self, pool):
+        """Free the slot of a timed out call and hand the backlog over to a
+        fresh worker.
+        """
+        pool._replace_worker()
+
+        with self._lock:
+            if not self._waiting:
+                self.active -= 1
+                return
+            item = self._waiting.popleft()
+
+        if not item[0]._put((self._run, item, {}, None), block=False):
+            with self._lock:
+                self.active -= 1
+
+    def stats(self):
+        """Return the current bulkhead statistics."""
+        return {
+            "limit": self.limit,
+            "active": self.active,
+            "waiting": len(self._waiting),
+            "shed": self.shed
+        }
+
+
+def _build_executor(name):
+    """Create an executor from the global and per-network configuration."""
+    pyhole_config = utils.get_config()
+    workers = pyhole_config.get("workers", type="int", default=8)
+    queue_size = pyhole_config.get("worker_queue_size", type="int",
+                                   default=64)
+    policy = pyhole_config.get("worker_saturation", default="drop")
+
+    if name in pyhole_config.sections():
+        network_config = utils.get_config(name)
+        workers = network_config.get("workers", type="int", default=workers)
+        queue_size = network_config.get("worker_queue_size", type="int",
+                                        default=queue_size)
+        policy = network_config.get("worker_saturation", default=policy)
+
+    return Executor(name, workers, queue_size, policy)
+
+
+def get_executor(name="Pyhole"):
+    """Return the worker pool for a network, creating it if needed."""
+    with _executors_lock:
+        if name not in _executors:
+            _executors[name] = _build_executor(name)
+        return _executors[name]
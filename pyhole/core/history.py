@@ -0,0 +1,183 @@
+#   Copyright 2026 agent
+#
+#   Licensed under the Apache License, Version 2.0 (the "License");
+#   you may not use this file except in compliance with the License.
+#   You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS,
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#   See the License for the specific language governing permissions and
+#   limitations under the License.
+
+"""Pyhole Chat History
+
+Every line a network logs is also added to a full-text index (SQLite FTS4
+where available), so history can be searched without going through the
+log files and their archives.
+"""
+
+import logging
+import os
+import re
+import sqlite3
+import threading
+
+import utils
+
+
+HISTORY_FILE = "history.db"
+BUSY_TIMEOUT = 10
+
+# NOTE(agent): Channel lines are logged as "-<channel>- ...", see the clients.
+CHANNEL_RE = re.compile(r"^-([#&][^\s]*)- ")
+
+_index = None
+_index_lock = threading.Lock()
+
+
+class HistoryIndex(object):
+    """A searchable index of logged lines."""
+
+    def __init__(self, path):
+        self.path = path
+        self.fts = True
+        self._local = threading.local()
+
+    def _connect(self):
+        """Return this thread's connection, opening it if needed."""
+        conn = getattr(self._local, "conn", None)
+        if conn and self._local.pid == os.getpid():
+            return conn
+
+        conn = sqlite3.connect(self.path, timeout=BUSY_TIMEOUT,
+                               isolation_level=None)
+        conn.text_factory = str
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.execute("CREATE TABLE IF NOT EXISTS lines (id INTEGER PRIMARY "
+                     "KEY, network TEXT, created REAL, line TEXT, "
+                     "channel TEXT)")
+        columns = [x[1] for x in conn.execute("PRAGMA table_info(lines)")]
+        if "channel" not in columns:
+            conn.execute("ALTER TABLE lines ADD COLUMN channel TEXT")
+        conn.execute("CREATE INDEX IF NOT EXISTS lines_network ON lines "
+                     "(network, id)")
+        conn.execute("CREATE INDEX IF NOT EXISTS lines_channel ON lines "
+                     "(network, channel, id)")
+        try:
+            conn.execute("CREATE VIRTUAL TABLE IF NOT EXISTS lines_fts "
+                         "USING fts4(content='lines', line)")
+        except sqlite3.OperationalError:
+            # NOTE(agent): SQLite was built without FTS, searches will have
+            # to scan the lines instead.
+            self.fts = False
+
+        self._local.conn = conn
+        self._local.pid = os.getpid()
+        return conn
+
+    def add_many(self, rows):
+        """Index several (network, created, line, channel) rows at once.
+        The channel is None for lines outside of channels.
+        """
+        conn = self._connect()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            for network, created, line, channel in rows:
+                cursor = conn.execute("INSERT INTO lines (network, created, "
+                                      "line, channel) VALUES (?, ?, ?, ?)",
+                                      (network, created, line,
+                                       _channel_key(channel)))
+                if self.fts:
+                    conn.execute("INSERT INTO lines_fts (docid, line) "
+                                 "VALUES (?, ?)", (cursor.lastrowid, line))
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        conn.execute("COMMIT")
+
+    def search(self, network, query, limit=10, channel=None):
+        """Return the newest (created, line) rows matching the query, only
+        those of a channel if one is given.
+        """
+        conn = self._connect()
+        where, args = _where(network, channel)
+        if not self.fts:
+            return conn.execute(
+                "SELECT created, line FROM lines WHERE %s AND line LIKE ? "
+                "ORDER BY id DESC LIMIT ?" % where,
+                args + ("%%%s%%" % query, limit)).fetchall()
+
+        sql = ("SELECT lines.created, lines.line FROM lines JOIN lines_fts ON "
+               "lines.id = lines_fts.docid WHERE lines_fts MATCH ? AND %s "
+               "ORDER BY lines.id DESC LIMIT ?" % where)
+        try:
+            return conn.execute(sql, (query,) + args + (limit,)).fetchall()
+        except sqlite3.OperationalError:
+            # NOTE(agent): Not a valid FTS query, look for its words as a
+            # phrase instead.  FTS phrases can't contain quotes.
+            phrase = '"%s"' % query.replace('"', " ")
+            return conn.execute(sql, (phrase,) + args + (limit,)).fetchall()
+
+    def last(self, network, limit=10, channel=None):
+        """Return the newest (created, line) rows, only those of a channel
+        if one is given.
+        """
+        where, args = _where(network, channel)
+        return self._connect().execute(
+            "SELECT created, line FROM lines WHERE %s ORDER BY id DESC "
+            "LIMIT ?" % where, args + (limit,)).fetchall()
+
+
+def _where(network, channel):
+    """Return the condition and arguments selecting a network's lines."""
+    if channel is None:
+        return "lines.network = ?", (network,)
+    return "lines.network = ? AND lines.channel = ?", (network,
+                                                       _channel_key(channel))
+
+
+def _channel_key(channel):
+    """Return the name a channel is stored under.  Channel names are not
+    case sensitive.
+    """
+    return channel.lower() if channel else channel
+
+
+class HistoryHandler(logging.Handler):
+    """Add logged lines to the history index.  Lines are collected and
+    written once per batch of the log writer.
+    """
+
+    def __init__(self, network, index):
+        logging.Handler.__init__(self, logging.INFO)
+        self.network = network
+        self.index = index
+        self._rows = []
+
+    def emit(self, record):
+        line = record.getMessage()
+        match = CHANNEL_RE.match(line)
+        self._rows.append((self.network, record.created, line,
+                           match.group(1) if match else None))
+
+    def flush_batch(self):
+        rows, self._rows = self._rows, []
+        if rows:
+            self.index.add_many(rows)
+
+    def flush(self):
+        self.flush_batch()
+
+
+def get_index():
+    """Return the history index, creating it if needed."""
+    global _index
+
+    with _index_lock:
+        if _index is None:
+            _index = HistoryIndex(utils.get_home_directory() + HISTORY_FILE)
+        return _index
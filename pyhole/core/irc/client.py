@@ -21,12 +21,14 @@ import time
 import irc.client as irclib
 from irc import connection
 
+from pyhole.core import executor
 from pyhole.core import logger
 from pyhole.core import plugin
 from pyhole.core import queue
 from pyhole.core import utils
 from pyhole.core import version
 from pyhole.core.irc import message
+from pyhole.core.irc import outbound
 
 
 class Client(irclib.SimpleIRCClient):
@@ -45,6 +47,7 @@ class Client(irclib.SimpleIRCClient):
         self.source = None
         self.target = None
         self.addressed = False
+        self.userhost = None
 
         self.admins = pyhole_config.get("admins", type="list")
         self.command_prefix = pyhole_config.get("command_prefix")
@@ -63,6 +66,14 @@ class Client(irclib.SimpleIRCClient):
                                                     default=None)
         self.channels = network_config.get("channels", type="list")
 
+        self.outbound = outbound.OutboundScheduler(
+            self._send,
+            network_config.get("flood_burst", type="int", default=5),
+            network_config.get("flood_rate", type="float", default=0.5),
+            pyhole_config.get("flood_queue_size", type="int", default=1000),
+            self.log)
+        self.outbound.start()
+
         self.load_plugins()
 
         self.log.info("Connecting to %s:%d as %s" % (self.server, self.port,
@@ -86,11 +97,18 @@ class Client(irclib.SimpleIRCClient):
 
     def notice(self, target, msg):
         """Send a notice."""
-        self.connection.notice(target, msg)
+        self.outbound.put("notice", target, msg, _has_priority())
 
     def reply(self, target, msg):
         """Reply to a target."""
-        self.connection.privmsg(target, msg)
+        self.outbound.put("privmsg", target, msg, _has_priority())
+
+    def _send(self, kind, target, msg):
+        """Send a line the outbound scheduler let through."""
+        if kind == "notice":
+            self.connection.notice(target, msg)
+        else:
+            self.connection.privmsg(target, msg)
 
     def op_user(self, params):
         """Op a user."""
@@ -136,8 +154,11 @@ class Client(irclib.SimpleIRCClient):
 
     def on_welcome(self, connection, _event):
         """Join channels upon successful connection."""
+        # NOTE(agent): IDENTIFY skips the outbound queue, so it reaches the
+        # server before the JOINs below; +r channels and cloaks need it.
         if self.identify_password:
-            self.reply("NickServ", "IDENTIFY %s" % self.identify_password)
+            connection.privmsg("NickServ", "IDENTIFY %s" %
+                               self.identify_password)
 
         for channel in self.channels:
             channel = channel.split(" ", 1)
@@ -147,12 +168,14 @@ class Client(irclib.SimpleIRCClient):
                 else:
                     connection.join(channel[0])
 
-        q = queue.MessageQueue()
-        q.watch(self)
+        queue.get_broker().watch(self)
 
     def on_disconnect(self, _connection, _event):
         """Attempt to reconnect after disconnection."""
         self.log.info("Disconnected from %s:%d." % (self.server, self.port))
+        dropped = self.outbound.clear()
+        if dropped:
+            self.log.info("Dropped %d unsent lines." % dropped)
         self.log.info("Reconnecting in %d seconds." % self.reconnect_delay)
         time.sleep(self.reconnect_delay)
         self.log.info("Connecting to %s:%d as %s." % (self.server, self.port,
@@ -205,6 +228,11 @@ class Client(irclib.SimpleIRCClient):
         source = event.source.nick
         self.log.info("-%s- %s joined" % (target, source))
 
+        # NOTE(agent): Our own join shows the user@host the server relays our
+        # messages with, which replies are split to fit.
+        if source == self.nick:
+            self.userhost = event.source.userhost
+
     def on_part(self, _connection, event):
         """Handle parts."""
         target = event.target
@@ -266,3 +294,9 @@ class Client(irclib.SimpleIRCClient):
 
         _msg = message.Reply(self, msg, source, target)
         plugin.poll_messages(self, _msg)
+
+
+def _has_priority():
+    """Return whether the hook running in this thread replies first."""
+    deadline = executor.current_deadline()
+    return bool(deadline and deadline.priority)
@@ -16,6 +16,16 @@
 
 import irc.client as irclib
 
+from pyhole.core import utils
+
+
+# NOTE(agent): Servers relay a line as ":<nick>!<user>@<host> <command>
+# <target> :<text>\r\n", in at most 512 bytes.  Until the bot's user@host
+# is known, assume the longest user and host most servers allow.
+MAX_LINE_BYTES = 512
+MAX_USER_LENGTH = 10
+MAX_HOST_LENGTH = 63
+
 
 class Message(object):
     def __init__(self, session, message):
@@ -38,8 +48,10 @@ class Message(object):
     def session(self, _session):
         self._session = _session
 
-    def _mangle_msg(self, msg):
-        """Prepare the message for sending."""
+    def _mangle_msg(self, msg, command="PRIVMSG", target="", prefix=""):
+        """Prepare the message for sending.  Lines too long for the server
+        are split, and the reply is cut short at reply_max_lines lines.
+        """
         if not hasattr(msg, "encode"):
             try:
                 msg = str(msg)
@@ -47,13 +59,19 @@ class Message(object):
                 self.session.log.error("msg cannot be converted to string")
                 return
 
-        msg = msg.split("\n")
-        # NOTE(jk0): 10 is completely arbitrary for now.
-        if len(msg) > 10:
-            msg = msg[0:8]
-            msg.append("...")
+        budget = line_budget(self.session, command, target) - len(prefix)
+
+        lines = []
+        for line in msg.split("\n"):
+            lines.extend(utils.split_utf8(line, budget))
+
+        max_lines = utils.get_config().get("reply_max_lines", type="int",
+                                           default=10)
+        if len(lines) > max_lines:
+            lines = lines[:max_lines - 1]
+            lines.append("...")
 
-        return msg
+        return lines
 
     def dispatch(self, reply):
         raise NotImplementedError("Message Dispatcher is not implemented")
@@ -70,7 +88,7 @@ class Notice(Message):
 
     def dispatch(self, reply):
         """Dispatch message as notice."""
-        _reply = self._mangle_msg(reply)
+        _reply = self._mangle_msg(reply, "NOTICE", self.target)
         for line in _reply:
             self.session.notice(self.target, line)
             if irclib.is_channel(self.target):
@@ -89,10 +107,12 @@ class Reply(Message):
 
     def dispatch(self, reply):
         """dispatch message as a reply."""
-        _reply = self._mangle_msg(reply)
+        source = self.source.split("!")[0]
+        prefix = "%s: " % source if self.session.addressed else ""
+
+        _reply = self._mangle_msg(reply, "PRIVMSG", self.target, prefix)
         for line in _reply:
             if self.session.addressed:
-                source = self.source.split("!")[0]
                 self.session.reply(self.target, "%s: %s" % (source, line))
                 self.session.log.info("-%s- <%s> %s: %s" % (self.target,
                                                             self.session.nick,
@@ -106,3 +126,15 @@ class Reply(Message):
                 else:
                     self.session.log.info("<%s> %s" % (self.session.nick,
                                                        line))
+
+
+def line_budget(session, command, target):
+    """Return how many bytes of text fit in a line to a target."""
+    userhost = getattr(session, "userhost", None)
+    if userhost:
+        userhost_length = len(userhost)
+    else:
+        userhost_length = MAX_USER_LENGTH + MAX_HOST_LENGTH + 1
+
+    overhead = len(":%s! %s %s :\r\n" % (session.nick, command, target))
+    return MAX_LINE_BYTES - userhost_length - overhead
@@ -0,0 +1,178 @@
+#   Copyright 2026 agent
+#
+#   Licensed under the Apache License, Version 2.0 (the "License");
+#   you may not use this file except in compliance with the License.
+#   You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS,
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#   See the License for the specific language governing permissions and
+#   limitations under the License.
+
+"""Pyhole Outbound IRC Scheduler
+
+IRC servers disconnect clients that send faster than their flood limits
+allow, typically a burst of a few lines and then one line every couple of
+seconds.  Outgoing lines are queued per target and sent at that pace by a
+single thread, taking turns between targets so one long reply can't hold
+up everyone else.  Lines for admins and priority plugins go first.
+"""
+
+import collections
+import threading
+import time
+
+
+class OutboundScheduler(object):
+    """Send lines through a token bucket of burst lines, refilled at rate
+    lines per second.  send(kind, target, line) does the actual sending.
+    """
+
+    def __init__(self, send, burst=5, rate=0.5, max_queued=1000, log=None):
+        self.send = send
+        self.burst = burst
+        self.rate = rate
+        self.max_queued = max_queued
+        self.log = log
+
+        self.sent = 0
+        self.dropped = 0
+        self.failed = 0
+        self.wait_total = 0.0
+        self.wait_max = 0.0
+
+        self._lanes = (_Lane(), _Lane())
+        self._tokens = float(burst)
+        self._stamp = time.time()
+        self._cond = threading.Condition()
+
+    def start(self):
+        """Start the sender thread."""
+        t = threading.Thread(target=self._run, name="outbound")
+        t.setDaemon(True)
+        t.start()
+
+    def put(self, kind, target, line, priority=False):
+        """Queue a line for a target.  Returns False if the queue is full
+        and the line was dropped.
+        """
+        with self._cond:
+            if len(self) >= self.max_queued:
+                self.dropped += 1
+                return False
+
+            self._lanes[0 if priority else 1].put(target, (kind, line,
+                                                           time.time()))
+            self._cond.notify()
+        return True
+
+    def clear(self):
+        """Forget the queued lines and refill the bucket, for a new
+        connection.
+        """
+        with self._cond:
+            dropped = len(self)
+            self._lanes = (_Lane(), _Lane())
+            self._tokens = float(self.burst)
+            self._stamp = time.time()
+        return dropped
+
+    def __len__(self):
+        return sum(len(lane) for lane in self._lanes)
+
+    def _refill(self, now):
+        """Add the tokens earned since the last refill."""
+        elapsed = max(now - self._stamp, 0)
+        self._tokens = min(self.burst, self._tokens + elapsed * self.rate)
+        self._stamp = now
+
+    def next_line(self, now=None):
+        """Take the next line if the bucket allows it.  Returns the
+        (kind, target, line) to send, or None and how long to wait for a
+        token.
+        """
+        now = now or time.time()
+        with self._cond:
+            self._refill(now)
+            if self._tokens < 1:
+                return None, (1 - self._tokens) / self.rate
+
+            for lane in self._lanes:
+                if lane:
+                    target, (kind, line, queued) = lane.pop()
+                    break
+            else:
+                return None, 0
+
+            self._tokens -= 1
+
+            wait = now - queued
+            self.wait_total += wait
+            self.wait_max = max(self.wait_max, wait)
+            self.sent += 1
+        return (kind, target, line), 0
+
+    def _run(self):
+        """Send queued lines as fast as the bucket allows."""
+        while True:
+            with self._cond:
+                while not len(self):
+                    self._cond.wait()
+
+            item, wait = self.next_line()
+            if item is None:
+                time.sleep(wait)
+                continue
+
+            kind, target, line = item
+            try:
+                self.send(kind, target, line)
+            except Exception, exc:
+                self.failed += 1
+                if self.log:
+                    self.log.error("Unable to send to %s: %s" % (target, exc))
+
+    def stats(self):
+        """Return the current queue depths, throughput and wait times."""
+        with self._cond:
+            return {
+                "queued": len(self),
+                "priority": len(self._lanes[0]),
+                "targets": len(self._lanes[0].targets) + len(
+                    self._lanes[1].targets),
+                "sent": self.sent,
+                "dropped": self.dropped,
+                "failed": self.failed,
+                "wait_avg": self.wait_total / self.sent if self.sent else 0.0,
+                "wait_max": self.wait_max
+            }
+
+
+class _Lane(object):
+    """Queued lines per target, served round-robin."""
+
+    def __init__(self):
+        self.targets = collections.OrderedDict()
+        self.size = 0
+
+    def put(self, target, item):
+        """Queue an item for a target."""
+        self.targets.setdefault(target, collections.deque()).append(item)
+        self.size += 1
+
+    def pop(self):
+        """Take the next item of the target whose turn it is.  The target
+        then goes to the back of the line.
+        """
+        target, items = self.targets.popitem(last=False)
+        item = items.popleft()
+        if items:
+            self.targets[target] = items
+        self.size -= 1
+        return target, item
+
+    def __len__(self):
+        return self.size
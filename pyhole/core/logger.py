@@ -15,13 +15,27 @@
 """Pyhole Logging"""
 
 import bz2
-import glob
+import errno
+import gzip
 import logging
 import logging.handlers
 import os
+import Queue
+import re
 import requests
 import shutil
+import threading
+import time
 
+try:
+    import lzma
+except ImportError:
+    try:
+        from backports import lzma
+    except ImportError:
+        lzma = None
+
+import history
 import utils
 
 
@@ -29,32 +43,346 @@ LOG_DIR = utils.get_directory("logs")
 LOG_ARCHIVE_DIR = utils.get_directory(os.path.join("logs", "archive"))
 LOG_FORMAT = "%(asctime)s [%(name)s] %(message)s"
 LOG_DATEFMT = "%H:%M:%S"
+LOG_BATCH_SIZE = 256
+
+ARCHIVE_CODECS = ("gz", "bz2", "xz")
+# NOTE(agent): Rotated logs are named <network>.log.<date>, see the suffix
+# used by TimedRotatingFileHandler for "midnight".
+ROTATED_RE = re.compile(r"^(?P<network>.+)\.log\.\d{4}-\d{2}-\d{2}"
+                        r"(?:_\d{2}(?:-\d{2}){0,2})?$")
+CLAIMED_RE = re.compile(r"^(?P<filename>.+)\.claimed-(?P<pid>\d+)$")
+
+_writer = None
+_writer_lock = threading.Lock()
+_archiver = None
+_archiver_lock = threading.Lock()
 
 
 class PyholeFileHandler(logging.handlers.TimedRotatingFileHandler):
+    # NOTE(agent): Set by the log writer, which flushes once per batch.
+    batched = False
+
+    def flush(self):
+        if not self.batched:
+            super(PyholeFileHandler, self).flush()
+
+    def flush_batch(self):
+        super(PyholeFileHandler, self).flush()
+
     def doRollover(self):
         result = super(PyholeFileHandler, self).doRollover()
-        self.archive_old_logs()
+        get_archiver().wake()
         return result
 
-    def archive_old_logs(self):
-        matcher = "*.log.*[!b][!z][!2]"
-        files = glob.glob(os.path.join(LOG_DIR, matcher))
-        for file_path in files:
-            filename = os.path.basename(file_path)
-            compressed_filename = filename + ".bz2"
-            network_name = filename[:filename.rfind(".log")]
-            archive_dir = os.path.join(LOG_ARCHIVE_DIR, network_name)
-            utils.make_directory(archive_dir)
-            compressed_file_path = os.path.join(archive_dir,
-                                                compressed_filename)
-
-            with open(file_path, "rb") as fp:
-                with bz2.BZ2File(compressed_file_path, "wb",
-                                 compresslevel=9) as output:
+
+class Archiver(object):
+    """Compress rotated logs into the archive in a background thread.
+
+    Every network process runs one, so each file is claimed by renaming it
+    first; a rename only succeeds for one process and claimed files are
+    skipped by the others.  Claimed files are compressed in parallel.
+    """
+
+    def __init__(self, codec="bz2", level=9, workers=2, log_dir=LOG_DIR,
+                 archive_dir=LOG_ARCHIVE_DIR):
+        if codec == "xz" and lzma is None:
+            logging.getLogger().warning("xz is not available, archiving "
+                                        "logs with bz2 instead")
+            codec = "bz2"
+
+        self.codec = codec if codec in ARCHIVE_CODECS else "bz2"
+        self.level = level
+        self.workers = workers
+        self.log_dir = log_dir
+        self.archive_dir = archive_dir
+
+        self._wake = threading.Event()
+        self._pid = None
+        self._lock = threading.Lock()
+
+    def wake(self):
+        """Look for logs to archive."""
+        with self._lock:
+            if self._pid != os.getpid():
+                self._wake = threading.Event()
+                t = threading.Thread(target=self._run, name="log-archiver")
+                t.setDaemon(True)
+                t.start()
+                self._pid = os.getpid()
+
+        self._wake.set()
+
+    def _run(self):
+        """Archive logs whenever woken up."""
+        while True:
+            self._wake.wait()
+            self._wake.clear()
+            try:
+                self.archive()
+            except Exception, exc:
+                logging.getLogger().exception(exc)
+
+    def _claim(self):
+        """Claim the rotated logs not claimed by a live process."""
+        claimed = []
+        for filename in os.listdir(self.log_dir):
+            match = CLAIMED_RE.match(filename)
+            if match:
+                if _pid_alive(int(match.group("pid"))):
+                    continue
+                original = match.group("filename")
+            else:
+                original = filename
+
+            if not ROTATED_RE.match(original):
+                continue
+
+            path = os.path.join(self.log_dir, filename)
+            claimed_path = os.path.join(self.log_dir, "%s.claimed-%d" % (
+                                        original, os.getpid()))
+            try:
+                os.rename(path, claimed_path)
+            except OSError:
+                continue
+            claimed.append((claimed_path, original))
+
+        return claimed
+
+    def archive(self):
+        """Compress every rotated log that can be claimed."""
+        claimed = Queue.Queue()
+        for item in self._claim():
+            claimed.put(item)
+
+        threads = []
+        for _i in range(min(self.workers, claimed.qsize())):
+            t = threading.Thread(target=self._compress_all, args=(claimed,))
+            t.start()
+            threads.append(t)
+
+        for t in threads:
+            t.join()
+
+    def _compress_all(self, claimed):
+        """Compress claimed logs until there are none left."""
+        while True:
+            try:
+                claimed_path, filename = claimed.get_nowait()
+            except Queue.Empty:
+                return
+
+            try:
+                self._compress(claimed_path, filename)
+            except Exception, exc:
+                logging.getLogger().exception(exc)
+                # NOTE(agent): Give it back, so it gets another try later.
+                try:
+                    os.rename(claimed_path, os.path.join(self.log_dir,
+                                                         filename))
+                except OSError:
+                    pass
+
+    def _compress(self, claimed_path, filename):
+        """Compress a claimed log into the archive and remove it."""
+        network_name = ROTATED_RE.match(filename).group("network")
+        archive_dir = os.path.join(self.archive_dir, network_name)
+        utils.make_directory(archive_dir)
+
+        archive_name = "%s.%s" % (filename, self.codec)
+        archive_path = os.path.join(archive_dir, archive_name)
+        tmp_path = "%s.%d.tmp" % (archive_path, os.getpid())
+
+        try:
+            with open(claimed_path, "rb") as fp:
+                output = self._open(tmp_path)
+                try:
                     shutil.copyfileobj(fp, output)
+                finally:
+                    output.close()
+
+            os.rename(tmp_path, archive_path)
+        except Exception:
+            # NOTE(agent): Don't leave a partial archive behind; the caller
+            # gives the claimed log back.
+            try:
+                os.remove(tmp_path)
+            except OSError:
+                pass
+            raise
+
+        os.remove(claimed_path)
+
+    def _open(self, path):
+        """Open a compressed file for writing."""
+        if self.codec == "gz":
+            return gzip.open(path, "wb", self.level)
+        elif self.codec == "xz":
+            return lzma.LZMAFile(path, "wb", preset=self.level)
+        return bz2.BZ2File(path, "wb", compresslevel=self.level)
+
+
+def _pid_alive(pid):
+    """Return whether a process is running."""
+    try:
+        os.kill(pid, 0)
+    except OSError, exc:
+        return exc.errno == errno.EPERM
+    return True
 
-            os.remove(file_path)
+
+def get_archiver():
+    """Return the log archiver, creating it if needed."""
+    global _archiver
+
+    with _archiver_lock:
+        if _archiver is None:
+            config = utils.get_config()
+            _archiver = Archiver(
+                config.get("log_archive_codec", default="bz2"),
+                config.get("log_archive_level", type="int", default=9),
+                config.get("log_archive_workers", type="int", default=2))
+        return _archiver
+
+
+class LogWriter(object):
+    """Write log records from a single thread, so that a slow disk never
+    holds up message handling.  Records are handed over through a bounded
+    queue and dropped, and counted, when it is full.
+    """
+
+    def __init__(self, queue_size=10000):
+        self.queue_size = queue_size
+        self.dropped = 0
+
+        self._reported = 0
+        self._queue = None
+        self._pid = None
+        self._lock = threading.Lock()
+
+    def _ensure_started(self):
+        """Start the writer thread, once per process."""
+        if self._pid == os.getpid():
+            return
+
+        with self._lock:
+            if self._pid == os.getpid():
+                return
+
+            self._queue = Queue.Queue(self.queue_size)
+            t = threading.Thread(target=self._run, name="log-writer")
+            t.setDaemon(True)
+            t.start()
+            self._pid = os.getpid()
+
+    def put(self, record, handlers):
+        """Queue a record for the given handlers."""
+        self._ensure_started()
+
+        try:
+            self._queue.put_nowait((record, handlers))
+        except Queue.Full:
+            self.dropped += 1
+
+    def _run(self):
+        """Write queued records in batches."""
+        while True:
+            batch = [self._queue.get()]
+            while len(batch) < LOG_BATCH_SIZE:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except Queue.Empty:
+                    break
+
+            try:
+                self._write(batch)
+            finally:
+                for _item in batch:
+                    self._queue.task_done()
+
+    def _write(self, batch):
+        """Write a batch of records, then flush each handler once."""
+        dropped = self.dropped - self._reported
+        if dropped:
+            # NOTE(agent): Build a new list, _run marks the items of the
+            # original one done.
+            record, handlers = batch[0]
+            batch = [(logging.makeLogRecord({
+                "name": record.name,
+                "levelno": logging.WARNING,
+                "levelname": "WARNING",
+                "msg": "Dropped %d log records" % dropped
+            }), handlers)] + batch
+            self._reported += dropped
+
+        written = set()
+        for record, handlers in batch:
+            for handler in handlers:
+                if record.levelno >= handler.level:
+                    try:
+                        handler.handle(record)
+                    except Exception:
+                        handler.handleError(record)
+                    written.add(handler)
+
+        for handler in written:
+            try:
+                getattr(handler, "flush_batch", handler.flush)()
+            except Exception:
+                pass
+
+    def flush(self, timeout=5):
+        """Wait for the queued records to be written."""
+        if self._pid != os.getpid():
+            return
+
+        deadline = time.time() + timeout
+        while self._queue.unfinished_tasks and time.time() < deadline:
+            time.sleep(0.01)
+
+
+class QueueHandler(logging.Handler):
+    """Pass records on to the log writer for the given handlers."""
+
+    def __init__(self, handlers, writer):
+        super(QueueHandler, self).__init__()
+        self.handlers = handlers
+        self.writer = writer
+
+    def prepare(self, record):
+        """Render the message now, since its arguments may change before
+        the writer gets to it.
+        """
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(
+                record.exc_info)
+            record.exc_info = None
+        return record
+
+    def emit(self, record):
+        try:
+            self.writer.put(self.prepare(record), self.handlers)
+        except Exception:
+            self.handleError(record)
+
+
+def get_writer():
+    """Return the log writer, creating it if needed."""
+    global _writer
+
+    with _writer_lock:
+        if _writer is None:
+            queue_size = utils.get_config().get("log_queue_size", type="int",
+                                                default=10000)
+            _writer = LogWriter(queue_size)
+        return _writer
+
+
+def flush():
+    """Write out the queued log records, e.g. before shutting down."""
+    if _writer:
+        _writer.flush()
 
 
 def setup_logger(name):
@@ -72,14 +400,33 @@ def setup_logger(name):
                         format=LOG_FORMAT,
                         datefmt=LOG_DATEFMT)
 
+    # NOTE(agent): Everything is written by the log writer thread; loggers
+    # only queue their records.
+    writer = get_writer()
+    root_log = logging.getLogger()
+    streams = [x for x in root_log.handlers
+               if not isinstance(x, QueueHandler)]
+    if streams:
+        root_log.handlers = [QueueHandler(streams, writer)]
+    else:
+        streams = root_log.handlers[0].handlers
+
     log_file = os.path.join(LOG_DIR, name.lower() + ".log")
     log = PyholeFileHandler(log_file, "midnight")
     log.setLevel(log_level)
     formatter = logging.Formatter(LOG_FORMAT, LOG_DATEFMT)
     log.setFormatter(formatter)
-    logging.getLogger(name).addHandler(log)
+    log.batched = True
+
+    handlers = [log] + streams
+    if utils.get_config().get("history_enabled", type="bool", default=True):
+        handlers.append(history.HistoryHandler(name, history.get_index()))
+
+    network_log = logging.getLogger(name)
+    network_log.addHandler(QueueHandler(handlers, writer))
+    network_log.propagate = False
 
-    log.archive_old_logs()
+    get_archiver().wake()
 
 
 def get_logger(name="Pyhole"):
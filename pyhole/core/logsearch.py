@@ -0,0 +1,153 @@
+#   Copyright 2026 agent
+#
+#   Licensed under the Apache License, Version 2.0 (the "License");
+#   you may not use this file except in compliance with the License.
+#   You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS,
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#   See the License for the specific language governing permissions and
+#   limitations under the License.
+
+"""Pyhole Log Search
+
+Search the compressed log archives of a network, one archive per worker
+process, for history older than the live index.
+
+Usage: pyhole-logsearch [-i] [-n <limit>] [-j <processes>] <network> <regex>
+"""
+
+import argparse
+import bz2
+import gzip
+import itertools
+import multiprocessing
+import os
+import re
+import sys
+
+import logger
+
+
+# NOTE(agent): Archives are named <network>.log.<date>.<codec>, see the
+# Archiver.
+ARCHIVE_RE = re.compile(r"^.+\.log\.(?P<date>\d{4}-\d{2}-\d{2})"
+                        r"(?:_\d{2}(?:-\d{2}){0,2})?\.(?P<codec>gz|bz2|xz)$")
+
+
+def list_archives(network, archive_dir=logger.LOG_ARCHIVE_DIR):
+    """Return the (date, path) of every archive of a network, oldest
+    first.  Network names are not case sensitive, as with the logs.
+    """
+    directory = os.path.join(archive_dir, network.lower())
+    if not os.path.isdir(directory):
+        return []
+
+    archives = []
+    for filename in os.listdir(directory):
+        match = ARCHIVE_RE.match(filename)
+        if match:
+            archives.append((match.group("date"),
+                             os.path.join(directory, filename)))
+    return sorted(archives)
+
+
+def open_archive(path):
+    """Open an archive for reading, whichever codec it was written with."""
+    if path.endswith(".gz"):
+        return gzip.open(path, "rb")
+    elif path.endswith(".xz"):
+        if logger.lzma is None:
+            raise IOError("No lzma module to read %s" % path)
+        return logger.lzma.LZMAFile(path, "rb")
+    return bz2.BZ2File(path, "rb")
+
+
+def _scan(args):
+    """Return up to limit lines of an archive matching a regex."""
+    path, pattern, flags, limit = args
+    regex = re.compile(pattern, flags)
+
+    matches = []
+    archive = open_archive(path)
+    try:
+        for line in archive:
+            if regex.search(line):
+                matches.append(line.rstrip("\r\n"))
+                if len(matches) >= limit:
+                    break
+    finally:
+        archive.close()
+    return matches
+
+
+def search(network, pattern, limit=100, processes=None, ignore_case=False,
+           archive_dir=logger.LOG_ARCHIVE_DIR):
+    """Yield the (date, line) of the lines matching a regex, oldest first,
+    until limit lines have been found.
+
+    Archives are scanned in parallel, but results are yielded in date
+    order.  Once enough lines are found the remaining scans are abandoned.
+    """
+    archives = list_archives(network, archive_dir)
+    if not archives or limit < 1:
+        return
+
+    flags = re.IGNORECASE if ignore_case else 0
+    jobs = [(path, pattern, flags, limit) for _date, path in archives]
+
+    # NOTE(agent): Compile here as well, so a bad regex fails in the caller
+    # rather than in every worker.
+    re.compile(pattern, flags)
+
+    processes = min(processes or multiprocessing.cpu_count(), len(jobs))
+    if processes < 2:
+        results = (_scan(job) for job in jobs)
+        pool = None
+    else:
+        pool = multiprocessing.Pool(processes)
+        results = pool.imap(_scan, jobs)
+
+    found = 0
+    try:
+        for (date, _path), matches in itertools.izip(archives, results):
+            for line in matches:
+                yield date, line
+                found += 1
+                if found >= limit:
+                    return
+    finally:
+        if pool:
+            pool.terminate()
+            pool.join()
+
+
+def main():
+    """Search the log archives from the command line."""
+    parser = argparse.ArgumentParser(
+        description="Search the log archives of a network.")
+    parser.add_argument("network", help="the network to search")
+    parser.add_argument("pattern", help="the regex to search for")
+    parser.add_argument("-n", "--limit", type=int, default=100,
+                        help="stop after this many matches")
+    parser.add_argument("-j", "--processes", type=int, default=None,
+                        help="worker processes (default: one per CPU)")
+    parser.add_argument("-i", "--ignore-case", action="store_true",
+                        help="ignore case distinctions")
+    args = parser.parse_args()
+
+    try:
+        for date, line in search(args.network, args.pattern, args.limit,
+                                 args.processes, args.ignore_case):
+            print "%s %s" % (date, line)
+    except re.error, exc:
+        parser.error("invalid pattern: %s" % exc)
+    except KeyboardInterrupt:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
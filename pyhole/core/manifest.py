@@ -0,0 +1,106 @@
+#   Copyright 2026 agent
+#
+#   Licensed under the Apache License, Version 2.0 (the "License");
+#   you may not use this file except in compliance with the License.
+#   You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS,
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#   See the License for the specific language governing permissions and
+#   limitations under the License.
+
+"""Pyhole Plugin Manifest
+
+The manifest records the hooks of every plugin module, keyed by a hash of
+its source, so that unchanged plugins can be registered without importing
+them.
+"""
+
+import hashlib
+import json
+import os
+
+import utils
+
+
+MANIFEST_FILE = "manifest.json"
+
+
+def get_path():
+    """Return the path to the manifest file."""
+    return utils.get_home_directory() + MANIFEST_FILE
+
+
+def load():
+    """Return the manifest, or an empty one if it can't be read."""
+    try:
+        with open(get_path(), "r") as manifest_file:
+            return json.load(manifest_file)
+    except (IOError, ValueError):
+        return {}
+
+
+def save(manifest):
+    """Write the manifest.  The file is replaced in one go since every
+    network process may be writing it.
+    """
+    path = get_path()
+    tmp_path = "%s.%d" % (path, os.getpid())
+
+    with open(tmp_path, "w") as manifest_file:
+        json.dump(manifest, manifest_file, indent=1, sort_keys=True)
+    os.rename(tmp_path, path)
+
+
+def file_hash(path):
+    """Return the SHA-1 hash of a file, or None if it can't be read."""
+    try:
+        with open(path, "rb") as source_file:
+            return hashlib.sha1(source_file.read()).hexdigest()
+    except IOError:
+        return None
+
+
+def describe(digest, classes, hook_names):
+    """Build the manifest entry of a module from its plugin classes.  Only
+    modules without poll hooks can be loaded lazily, since polls have to
+    start running right away.
+    """
+    entry = {
+        "hash": digest,
+        "lazy": True,
+        "classes": []
+    }
+
+    for cls in classes:
+        hooks = []
+        for attr_name in dir(cls):
+            attr = getattr(cls, attr_name)
+            for hook_key in hook_names:
+                if not getattr(attr, "_is_%s_hook" % hook_key, False):
+                    continue
+
+                if hook_key == "poll":
+                    entry["lazy"] = False
+
+                hooks.append({
+                    "type": hook_key,
+                    "attr": attr_name,
+                    "arg": getattr(attr, "_hook_arg", None),
+                    "doc": attr.__doc__,
+                    "timeout": getattr(attr, "_hook_timeout", None),
+                    "timeout_reply": getattr(attr, "_hook_timeout_reply",
+                                             None)
+                })
+
+        entry["classes"].append({
+            "name": cls.__name__,
+            "doc": cls.__doc__,
+            "priority": getattr(cls, "priority", False),
+            "hooks": hooks
+        })
+
+    return entry
@@ -0,0 +1,333 @@
+#   Copyright 2026 agent
+#
+#   Licensed under the Apache License, Version 2.0 (the "License");
+#   you may not use this file except in compliance with the License.
+#   You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS,
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#   See the License for the specific language governing permissions and
+#   limitations under the License.
+
+"""Pyhole Paste Store
+
+Paste contents are stored once per SHA-256 digest, gzipped, under
+pastes/objects/ab/cd/<digest>.gz.  Paste IDs map to their digest through
+an index kept in the storage backend.
+
+Pastes are evicted by a background compactor once they outlive the TTL or
+the store outgrows its quotas, least recently viewed first.  View times
+are kept in memory and written to the index by the compactor, so neither
+viewing nor creating a paste ever has to walk the store.
+"""
+
+import collections
+import gzip
+import hashlib
+import json
+import logging
+import os
+import re
+import threading
+import time
+import uuid
+
+import storage
+import utils
+
+
+PASTE_DIR = "pastes"
+CHUNK_SIZE = 64 * 1024
+
+_ID_RE = re.compile(r"^[0-9a-f]{32}$")
+
+_store = None
+_store_lock = threading.Lock()
+
+
+class PasteStore(object):
+    """Content-addressed, compressed paste storage."""
+
+    def __init__(self, root, index):
+        self.root = root
+        self.index = index
+        self.log = logging.getLogger()
+
+        self._accessed = {}
+        # NOTE(agent): Held while blobs are written or deleted, so a blob
+        # can't be deleted after a new paste has found it in place.
+        self._lock = threading.Lock()
+
+    def object_path(self, digest):
+        """Return the path to the blob of a digest."""
+        return os.path.join(self.root, "objects", digest[:2], digest[2:4],
+                            digest + ".gz")
+
+    def _write_object(self, digest, content):
+        """Compress content into its blob, unless it is already stored."""
+        path = self.object_path(digest)
+        if os.path.exists(path):
+            return
+
+        utils.make_directory(os.path.dirname(path))
+        tmp_path = "%s.%s" % (path, uuid.uuid4().hex)
+
+        # NOTE(agent): A fixed mtime keeps the blob of a digest byte for byte
+        # the same, so it can be served with the digest as its ETag.
+        with open(tmp_path, "wb") as blob:
+            with gzip.GzipFile(fileobj=blob, mode="wb", mtime=0) as gz:
+                gz.write(content)
+        os.rename(tmp_path, path)
+
+    def create(self, content):
+        """Store a paste and return its ID."""
+        if isinstance(content, unicode):
+            content = content.encode("utf-8")
+
+        digest = hashlib.sha256(content).hexdigest()
+        paste_id = uuid.uuid4().hex
+
+        with self._lock:
+            self._write_object(digest, content)
+            self._index(paste_id, digest, len(content), time.time())
+        return paste_id
+
+    def _index(self, paste_id, digest, size, created):
+        """Record which blob a paste ID refers to."""
+        record = {
+            "id": paste_id,
+            "digest": digest,
+            "size": size,
+            "stored": os.path.getsize(self.object_path(digest)),
+            "created": created,
+            "accessed": created
+        }
+        self.index.put(paste_id, json.dumps(record))
+        return record
+
+    def lookup(self, paste_id):
+        """Return the record of a paste, or None if there is no such paste."""
+        if not _ID_RE.match(paste_id):
+            return None
+
+        record = self.index.get(paste_id)
+        if record:
+            return json.loads(record)
+
+        return self._migrate(paste_id)
+
+    def _migrate(self, paste_id):
+        """Move a paste stored the old way, as a plain file named after its
+        ID, into the store.
+        """
+        path = os.path.join(self.root, paste_id)
+        try:
+            with open(path, "rb") as paste_file:
+                content = paste_file.read()
+            created = os.path.getmtime(path)
+        except (IOError, OSError):
+            # NOTE(agent): Another request may have just migrated it.
+            record = self.index.get(paste_id)
+            return json.loads(record) if record else None
+
+        digest = hashlib.sha256(content).hexdigest()
+        with self._lock:
+            self._write_object(digest, content)
+            record = self._index(paste_id, digest, len(content), created)
+
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+
+        return record
+
+    def touch(self, paste_id):
+        """Note that a paste has been viewed."""
+        self._accessed[paste_id] = time.time()
+
+    def compact(self, ttl=0, max_bytes=0, max_count=0, now=None):
+        """Evict the pastes that haven't been viewed within ttl seconds,
+        then the least recently viewed ones until the store fits in
+        max_bytes of blobs and max_count pastes.  A limit of 0 means no
+        limit.  Returns the IDs of the evicted pastes.
+        """
+        now = now or time.time()
+        accessed, self._accessed = self._accessed, {}
+
+        records = []
+        updated = []
+        for paste_id, record in self.index.scan():
+            record = json.loads(record)
+            if paste_id in accessed:
+                record["accessed"] = accessed[paste_id]
+                updated.append((paste_id, json.dumps(record)))
+            records.append(record)
+
+        if updated:
+            self.index.put_many(updated)
+
+        records.sort(key=lambda x: x.get("accessed", x["created"]))
+
+        refs = collections.Counter(x["digest"] for x in records)
+        stored = {}
+        for record in records:
+            if record["digest"] not in stored:
+                stored[record["digest"]] = self._stored_size(record)
+        total_bytes = sum(stored.values())
+        count = len(records)
+
+        evicted = []
+        for record in records:
+            last_access = record.get("accessed", record["created"])
+            expired = ttl and last_access < now - ttl
+            over_count = max_count and count > max_count
+            over_bytes = max_bytes and total_bytes > max_bytes
+            if not (expired or over_count or over_bytes):
+                break
+
+            evicted.append(record)
+            count -= 1
+            refs[record["digest"]] -= 1
+            if not refs[record["digest"]]:
+                total_bytes -= stored[record["digest"]]
+
+        for record in evicted:
+            self.index.delete(record["id"])
+
+        unused = set(x["digest"] for x in evicted if not refs[x["digest"]])
+        with self._lock:
+            # NOTE(agent): A paste with the same contents may have been
+            # created since the scan, so look again now that no new one
+            # can be.
+            if unused:
+                unused -= set(json.loads(record)["digest"]
+                              for _id, record in self.index.scan())
+
+            for digest in unused:
+                try:
+                    os.remove(self.object_path(digest))
+                except OSError:
+                    pass
+
+        if evicted:
+            self.log.info("Evicted %d pastes, %d left (%d bytes)" % (
+                          len(evicted), count, total_bytes))
+
+        return [x["id"] for x in evicted]
+
+    def _stored_size(self, record):
+        """Return the size of a paste's blob on disk."""
+        if "stored" in record:
+            return record["stored"]
+
+        try:
+            return os.path.getsize(self.object_path(record["digest"]))
+        except OSError:
+            return 0
+
+    def read(self, record):
+        """Return the contents of a paste."""
+        with gzip.open(self.object_path(record["digest"]), "rb") as gz:
+            return gz.read()
+
+    def stream(self, record, start=0, stop=None):
+        """Yield the contents of a paste from start up to stop, a chunk at a
+        time.
+        """
+        if stop is None:
+            stop = record["size"]
+
+        with gzip.open(self.object_path(record["digest"]), "rb") as gz:
+            gz.seek(start)
+            remaining = stop - start
+            while remaining > 0:
+                chunk = gz.read(min(CHUNK_SIZE, remaining))
+                if not chunk:
+                    break
+                remaining -= len(chunk)
+                yield chunk
+
+
+class RenderCache(object):
+    """A least recently used cache of rendered pages, bounded by the total
+    size of the pages.
+    """
+
+    def __init__(self, max_bytes):
+        self.max_bytes = max_bytes
+        self.bytes = 0
+
+        self._pages = collections.OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        """Return a cached page, or None."""
+        with self._lock:
+            page = self._pages.pop(key, None)
+            if page is not None:
+                self._pages[key] = page
+            return page
+
+    def put(self, key, page):
+        """Cache a page, evicting the least recently used ones to make
+        room.
+        """
+        if len(page) > self.max_bytes:
+            return
+
+        with self._lock:
+            old_page = self._pages.pop(key, None)
+            if old_page is not None:
+                self.bytes -= len(old_page)
+
+            self._pages[key] = page
+            self.bytes += len(page)
+
+            while self.bytes > self.max_bytes:
+                _key, old_page = self._pages.popitem(last=False)
+                self.bytes -= len(old_page)
+
+    def discard(self, key):
+        """Drop a page from the cache."""
+        with self._lock:
+            page = self._pages.pop(key, None)
+            if page is not None:
+                self.bytes -= len(page)
+
+
+@utils.spawn_thread
+def run_compactor(on_evict=None):
+    """Compact the paste store every paste_compact_interval seconds."""
+    config = utils.get_config()
+    interval = config.get("paste_compact_interval", type="int", default=300)
+    ttl = config.get("paste_ttl", type="int", default=0)
+    max_bytes = config.get("paste_max_bytes", type="int", default=0)
+    max_count = config.get("paste_max_count", type="int", default=0)
+
+    store = get_store()
+    while True:
+        time.sleep(interval)
+        try:
+            evicted = store.compact(ttl, max_bytes, max_count)
+        except Exception, exc:
+            store.log.exception(exc)
+            continue
+
+        if on_evict:
+            for paste_id in evicted:
+                on_evict(paste_id)
+
+
+def get_store():
+    """Return the paste store, creating it if needed."""
+    global _store
+
+    with _store_lock:
+        if _store is None:
+            _store = PasteStore(utils.get_directory(PASTE_DIR),
+                                storage.get_namespace("PasteIndex"))
+        return _store
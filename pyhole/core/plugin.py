@@ -14,58 +14,65 @@
 
 """Pyhole Plugin Manager"""
 
+import collections
 import functools
 import os
 import re
+import sre_constants
+import sre_parse
 import sys
-import time
+import threading
 
+import pyhole.plugins
+
+import executor
 import logger
+import manifest
+import ratelimit
+import scheduler
 import utils
 
 
 LOG = logger.get_logger()
 
-_plugin_instances = []
-_plugin_hooks = {}
+_registry = None
+_registry_lock = threading.Lock()
+_module_mtimes = {}
+_polls = []
+
+_COMMAND_RE = re.compile(r"^(\S+)(?:\s(.*))?$")
 
 
 def _reset_variables():
     """Local function to init some variables that are common between
     load and reload
     """
-    global _plugin_instances
-    global _plugin_hooks
+    global _registry
 
-    _plugin_instances = []
-    _plugin_hooks = {}
+    _registry = Registry([])
 
-    for x in _hook_names:
-        _plugin_hooks[x] = []
 
-
-def hook_add(hookname, arg, poll_timer=60):
+def hook_add(hookname, arg, poll_timer=60, timeout=None,
+             timeout_reply=None):
     """Generic decorator to add hooks.  Generally, this is not called
     directly by plugins.  Decorators that plugins use are automatically
-    generated below with the setattrs you'll see
+    generated below with the setattrs you'll see.  'timeout' is the
+    deadline in seconds for a single call of the hook and 'timeout_reply'
+    whether the user is told when it is missed; both default to the
+    hook_timeout and hook_timeout_reply config options
     """
     def wrap(f):
-        if hookname == "poll":
-            @utils.spawn
-            def _f(self, *args, **kwargs):
-                while True:
-                    f(self, *args, **kwargs)
-                    time.sleep(poll_timer)
+        setattr(f, "_is_%s_hook" % hookname, True)
+        f._hook_arg = arg
+        f._hook_timeout = timeout
+        f._hook_timeout_reply = timeout_reply
 
-            setattr(_f, "_is_%s_hook" % hookname, True)
-            _f._hook_arg = arg
-
-            return _f
-        else:
-            setattr(f, "_is_%s_hook" % hookname, True)
-            f._hook_arg = arg
+        if hookname == "poll":
+            f._poll_timer = poll_timer
+        elif hookname == "msg_regex":
+            f._hook_regex = re.compile(arg, re.I)
 
-            return f
+        return f
 
     return wrap
 
@@ -75,7 +82,7 @@ def hook_get(hookname):
     this is not called directly.  Callers tend to use the dynamically
     generated calls 'hook_get_*' that are created below with the setattrs
     """
-    return _plugin_hooks[hookname]
+    return _registry.hooks[hookname]
 
 
 def active_get(hookname):
@@ -84,7 +91,73 @@ def active_get(hookname):
     generated calls 'active_get_*' that are created below with the
     setattrs
     """
-    return ", ".join(sorted([x[2] for x in _plugin_hooks[hookname]]))
+    return ", ".join(sorted([x[2] for x in _registry.hooks[hookname]]))
+
+
+class Registry(object):
+    """The hooks of a set of plugin instances, along with the indexes used
+    to dispatch messages to them.  A registry is built in full before it
+    replaces the active one, so dispatch never sees half loaded plugins
+    """
+
+    def __init__(self, instances):
+        self.instances = instances
+        self.hooks = dict((x, []) for x in _hook_names)
+
+        for instance in instances:
+            # Find all of the attributes in the class that have a
+            # _is_*_hook attribute
+            for attr_name in dir(instance):
+                attr = getattr(instance, attr_name)
+
+                for hook_key in _hook_names:
+                    if getattr(attr, "_is_%s_hook" % hook_key, False):
+                        hook_arg = getattr(attr, "_hook_arg", None)
+                        # Append (module, method, arg) tuple
+                        self.hooks[hook_key].append((attr.__module__, attr,
+                                                     hook_arg))
+
+        self.commands = self._index("command")
+        self.keywords = self._index("keyword")
+        self.keyword_trie = self._build_keyword_trie()
+        self.msg_regexs = self._build_msg_regex_scanner()
+
+    def _index(self, hook_key):
+        """Index hooks by their lower-cased argument so that a message only
+        costs a single dictionary lookup, regardless of how many hooks are
+        registered
+        """
+        index = {}
+        for hook in self.hooks[hook_key]:
+            index.setdefault(hook[2].lower(), []).append(hook)
+        return index
+
+    def _build_keyword_trie(self):
+        """Build a trie of the lower-cased keywords, so that every keyword a
+        word starts with is found in a single walk over the word, no matter
+        how many keywords are registered
+        """
+        trie = {}
+        for keyword in self.keywords:
+            node = trie
+            for char in keyword:
+                node = node.setdefault(char, {})
+            node[None] = keyword
+        return trie
+
+    def _build_msg_regex_scanner(self):
+        """Pair every msg_regex hook with its precompiled pattern and the
+        literal strings the pattern requires, so messages that can't
+        possibly match skip the regex engine entirely
+        """
+        scanner = []
+        for mod_name, func, msg_regex in self.hooks["msg_regex"]:
+            regex = getattr(func, "_hook_regex", None)
+            if regex is None:
+                regex = re.compile(msg_regex, re.I)
+            hints = _required_literals(msg_regex)
+            scanner.append((mod_name, func, regex, hints))
+        return scanner
 
 
 _hook_names = ["keyword", "command", "msg_regex", "poll"]
@@ -118,9 +191,18 @@ class PluginMetaClass(type):
 
 
 class Plugin(object):
-    """The class that all plugin classes should inherit from"""
+    """The class that all plugin classes should inherit from.  Plugins may
+    set 'concurrency' and 'backlog' to limit how many of their calls can
+    run in the worker pool at once, and 'priority' to have their replies
+    sent ahead of the others
+    """
     __metaclass__ = PluginMetaClass
 
+    concurrency = None
+    backlog = None
+    bulkhead = None
+    priority = False
+
     def __init__(self, session, *args, **kwargs):
         """Default constructor for Plugin. Stores the client instance, etc"""
         self.session = session
@@ -128,120 +210,411 @@ class Plugin(object):
 
 
 def _init_plugins(*args, **kwargs):
-    """Create instances of the plugin classes and create a cache
-    of their hook functions
+    """Create instances of the plugin classes and make their hooks the
+    active ones
     """
-    for cls in Plugin._plugin_classes:
-        # Create instance of 'p'
+    global _registry
+
+    instances = [_create_instance(cls, *args, **kwargs)
+                 for cls in Plugin._plugin_classes]
+    _registry = Registry([x for x in instances if x])
+
+
+def _create_instance(cls, *args, **kwargs):
+    """Create an instance of a plugin class."""
+    try:
         instance = cls(*args, **kwargs)
-        # Store the instance
-        _plugin_instances.append(instance)
-
-        # Setup _keyword_hooks by looking at all of the attributes
-        # in the class and finding the ones that have a _is_*_hook
-        # attribute
-        for attr_name in dir(instance):
-            attr = getattr(instance, attr_name)
-
-            for hook_key in _hook_names:
-                if getattr(attr, "_is_%s_hook" % hook_key, False):
-                    hook_arg = getattr(attr, "_hook_arg", None)
-                    # Append (module, method, arg) tuple
-                    _plugin_hooks[hook_key].append((attr.__module__, attr,
-                                                    hook_arg))
-
-
-def load_user_plugin(plugin, *args, **kwargs):
-    """Load a user plugin"""
-    sys.path.append(utils.get_home_directory() + "plugins")
-    user_plugins = os.listdir(utils.get_directory("plugins"))
-
-    for user_plugin in user_plugins:
-        if user_plugin.endswith(".py"):
-            user_plugin = user_plugin[:-3]
-            if plugin == user_plugin:
-                try:
-                    __import__(plugin, globals(), locals(), [plugin])
-                except Exception, exc:
-                    LOG.error(exc)
+    except Exception, exc:
+        LOG.exception(exc)
+        return None
 
+    instance.bulkhead = _build_bulkhead(instance)
+    return instance
 
-def load_plugins(*args, **kwargs):
-    """Module function that loads plugins from a particular directory"""
+
+def _build_bulkhead(instance):
+    """Create the concurrency limit for a plugin instance.  A section named
+    after the plugin in the config file overrides the plugin's defaults
+    """
     config = utils.get_config()
-    plugin_names = config.get("plugins", type="list")
+    limit = instance.concurrency or config.get("plugin_concurrency",
+                                               type="int", default=4)
+    backlog = instance.backlog or config.get("plugin_backlog", type="int",
+                                             default=16)
 
-    for plugin_name in plugin_names:
-        load_user_plugin(plugin_name, *args, **kwargs)
+    if instance.name in config.sections():
+        plugin_config = utils.get_config(instance.name)
+        limit = plugin_config.get("concurrency", type="int", default=limit)
+        backlog = plugin_config.get("backlog", type="int", default=backlog)
 
-        try:
-            __import__("pyhole.plugins", globals(), locals(), [plugin_name])
-        except Exception, exc:
-            LOG.exception(exc)
+    session = getattr(instance, "session", None)
+    log = getattr(session, "log", LOG)
 
-    _init_plugins(*args, **kwargs)
+    return executor.Bulkhead(instance.name, limit, backlog, log)
 
 
-def reload_plugins(*args, **kwargs):
-    """Module function that'll reload all of the plugins"""
-    config = utils.get_config()
+def _required_literals(pattern):
+    """Return a tuple of lower-cased strings, one of which must appear in any
+    text the pattern matches, or None if no such strings can be found
+    """
+    try:
+        return _find_literals(sre_parse.parse(pattern))
+    except Exception:
+        return None
+
 
-    # Terminate running poll instances
-    for plugin in _plugin_instances:
-        for attr_name in dir(plugin):
-            attr = getattr(plugin, attr_name)
-            if getattr(attr, "_is_poll_hook", False):
-                # TODO(jk0): Doing this kills the entire process. We need to
-                # figure out how to kill it properly. Until this is done,
-                # reloading will not work with polls.
-                # attr().throw(KeyboardInterrupt)
-                pass
-
-    # When the modules are reloaded, the meta class will append
-    # all of the classes again, so we need to make sure this is empty
-    Plugin._plugin_classes = []
-    _reset_variables()
-
-    # Now reload all of the plugins
-    plugins_to_reload = []
-    plugindir = "pyhole.plugins"
-    local_plugin_dir = utils.get_home_directory() + "plugins"
-
-    # Reload existing plugins
-    for mod, val in sys.modules.items():
-        if plugindir in mod and val and mod != plugindir:
-            mod_file = val.__file__
-            if not os.path.isfile(mod_file):
+def _find_literals(items):
+    """Walk a parsed pattern and pick its most selective literal hint."""
+    candidates = []
+    run = ""
+
+    for op, av in items:
+        if op == sre_constants.LITERAL and av < 128:
+            run += chr(av).lower()
+            continue
+
+        if run:
+            candidates.append((run,))
+            run = ""
+
+        hint = None
+        if op == sre_constants.SUBPATTERN:
+            hint = _find_literals(av[-1])
+        elif op == sre_constants.BRANCH:
+            branches = [_find_literals(x) for x in av[1]]
+            if all(branches):
+                hint = tuple(x for branch in branches for x in branch)
+        elif op in (sre_constants.MAX_REPEAT, sre_constants.MIN_REPEAT):
+            if av[0] > 0:
+                hint = _find_literals(av[2])
+
+        if hint:
+            candidates.append(hint)
+
+    if run:
+        candidates.append((run,))
+
+    if not candidates:
+        return None
+
+    return max(candidates, key=lambda x: min(len(y) for y in x))
+
+
+def _source_mtime(module):
+    """Return the modification time of a module's source file."""
+    path = getattr(module, "__file__", None) or ""
+    if path.endswith((".pyc", ".pyo")):
+        path = path[:-1]
+
+    try:
+        return os.path.getmtime(path)
+    except OSError:
+        return None
+
+
+def _import_plugin(module_name, fromlist, reload_changed=False):
+    """Import a plugin module, or reload it if its source has changed since
+    it was last loaded.  Returns the module, if there is one.
+    """
+    module = sys.modules.get(module_name)
+
+    try:
+        if module is None:
+            __import__(fromlist[0], globals(), locals(), fromlist[1:])
+        elif reload_changed:
+            if _source_mtime(module) != _module_mtimes.get(module_name):
+                LOG.info("Reloading %s" % module_name)
+                reload(module)
+    except Exception, exc:
+        LOG.exception(exc)
+
+    module = sys.modules.get(module_name)
+    if module:
+        _module_mtimes[module_name] = _source_mtime(module)
+
+    return module
+
+
+def _import_plugins(reload_changed=False):
+    """Import the configured plugins.  Plugins whose source matches their
+    manifest entry are not imported, but returned for lazy loading.
+    Returns the names of the imported modules and the manifest entries of
+    the lazy ones.
+    """
+    config = utils.get_config()
+    lazy_plugins = config.get("lazy_plugins", type="bool", default=True)
+    local_plugin_dir = utils.get_directory("plugins")
+    if local_plugin_dir not in sys.path:
+        sys.path.append(local_plugin_dir)
+    user_plugins = os.listdir(local_plugin_dir)
+
+    plugins_dir = os.path.dirname(pyhole.plugins.__file__)
+    plugin_manifest = manifest.load()
+    manifest_changed = False
+
+    module_names = set()
+    lazy = {}
+    for plugin_name in config.get("plugins", type="list"):
+        if plugin_name + ".py" in user_plugins:
+            if _import_plugin(plugin_name, [plugin_name, plugin_name],
+                              reload_changed):
+                module_names.add(plugin_name)
+
+        module_name = "pyhole.plugins.%s" % plugin_name
+        digest = manifest.file_hash(os.path.join(plugins_dir,
+                                                 plugin_name + ".py"))
+        entry = plugin_manifest.get(module_name)
+
+        fresh = digest and entry and entry["hash"] == digest
+        if lazy_plugins and fresh and entry["lazy"]:
+            if module_name not in sys.modules:
+                lazy[module_name] = entry
                 continue
-            for p in config.get("plugins", type="list"):
-                if plugindir + "." + p == mod:
-                    plugins_to_reload.append(mod)
 
-        if local_plugin_dir in str(val):
-            plugins_to_reload.append(mod)
+        if _import_plugin(module_name, ["pyhole.plugins", plugin_name],
+                          reload_changed):
+            module_names.add(module_name)
+
+            if digest and not fresh:
+                classes = _latest_classes(set([module_name]))
+                plugin_manifest[module_name] = manifest.describe(
+                    digest, classes, _hook_names)
+                manifest_changed = True
 
-    for plugin in plugins_to_reload:
+    if manifest_changed:
         try:
-            reload(sys.modules[plugin])
-        except Exception, exc:
+            manifest.save(plugin_manifest)
+        except (IOError, OSError), exc:
             LOG.error(exc)
 
-    # Load new plugins
-    load_plugins(*args, **kwargs)
+    return module_names, lazy
+
+
+def _latest_classes(module_names):
+    """Return the plugin classes of the given modules.  When a module is
+    reloaded, the meta class appends its classes again, so only the newest
+    class of each name is kept.
+    """
+    classes = collections.OrderedDict()
+    for cls in Plugin._plugin_classes:
+        if cls.__module__ in module_names:
+            classes[(cls.__module__, cls.__name__)] = cls
+    return classes.values()
+
+
+class LazyPlugin(object):
+    """Stands in for a plugin that hasn't been imported yet.  The first
+    call to one of its hooks imports the real plugin in the worker pool
+    and swaps it in.
+    """
+
+    def __init__(self, *args, **kwargs):
+        self.session = kwargs.get("session", args[0] if args else None)
+        self.name = self.__class__.__name__
+        self._args = args
+        self._kwargs = kwargs
+        self._instance = None
+        self._lock = threading.Lock()
+
+    def _load(self):
+        """Import the real plugin and replace this stand-in with it."""
+        global _registry
+
+        with self._lock:
+            if self._instance:
+                return self._instance
+
+            LOG.info("Loading %s" % self._module_name)
+            module_name = self._module_name
+            _import_plugin(module_name, [module_name])
+
+            for cls in _latest_classes(set([module_name])):
+                if cls.__name__ == self.name:
+                    self._instance = _create_instance(cls, *self._args,
+                                                      **self._kwargs)
+
+            if not self._instance:
+                raise ImportError("Unable to load %s" % self.name)
+
+            # NOTE(agent): A reload may have replaced this stand-in while
+            # the plugin was loading; its registry must not be undone.
+            with _registry_lock:
+                if any(x is self for x in _registry.instances):
+                    instances = [self._instance if x is self else x
+                                 for x in _registry.instances]
+                    _registry = Registry(instances)
+
+            return self._instance
+
+    def _load_and_call(self, attr_name, *args, **kwargs):
+        """Load the real plugin and make the call to its hook."""
+        return getattr(self._load(), attr_name)(*args, **kwargs)
+
+
+def _lazy_hook(attr_name, hook):
+    """Create a hook that forwards to the real plugin's hook.  Until the
+    plugin is loaded, calls go to the worker pool, as loading imports the
+    module and runs the plugin's constructor, which may do network I/O.
+    """
+    def _hook(self, *args, **kwargs):
+        if self._instance:
+            return getattr(self._instance, attr_name)(*args, **kwargs)
+
+        pool = executor.get_executor(self.session.log.name)
+        pool.submit(self._load_and_call, attr_name, *args, **kwargs)
+
+    _hook.__name__ = str(attr_name)
+    _hook.__doc__ = hook["doc"]
+    setattr(_hook, "_is_%s_hook" % hook["type"], True)
+    _hook._hook_arg = hook["arg"]
+    _hook._hook_timeout = hook["timeout"]
+    _hook._hook_timeout_reply = hook["timeout_reply"]
+
+    if hook["type"] == "msg_regex":
+        _hook._hook_regex = re.compile(hook["arg"], re.I)
+
+    return _hook
+
+
+def _create_lazy_instances(lazy, *args, **kwargs):
+    """Create stand-ins for the plugins in the given manifest entries."""
+    instances = []
+    for module_name, entry in sorted(lazy.items()):
+        for cls_entry in entry["classes"]:
+            attrs = {
+                "__doc__": cls_entry["doc"],
+                "__module__": module_name,
+                "_module_name": module_name,
+                "priority": cls_entry.get("priority", False)
+            }
+            for hook in cls_entry["hooks"]:
+                hook_func = _lazy_hook(hook["attr"], hook)
+                hook_func.__module__ = module_name
+                attrs[str(hook["attr"])] = hook_func
+
+            cls = type(str(cls_entry["name"]), (LazyPlugin,), attrs)
+            instances.append(cls(*args, **kwargs))
+
+    return instances
+
+
+def load_plugins(*args, **kwargs):
+    """Module function that loads plugins from a particular directory"""
+    global _registry
+
+    with _registry_lock:
+        _module_names, lazy = _import_plugins()
+
+        instances = [_create_instance(cls, *args, **kwargs)
+                     for cls in Plugin._plugin_classes]
+        instances += _create_lazy_instances(lazy, *args, **kwargs)
+        _registry = Registry([x for x in instances if x])
+
+
+def reload_plugins(*args, **kwargs):
+    """Module function that'll reload the plugins whose source has changed.
+    The new set of hooks is built off to the side and swapped in at once,
+    so messages keep being dispatched to the old hooks in the meantime
+    """
+    global _registry
+
+    with _registry_lock:
+        module_names, lazy = _import_plugins(reload_changed=True)
+        classes = _latest_classes(module_names)
+
+        # Plugins that were not reloaded keep their instances
+        instances = dict((x.__class__, x) for x in _registry.instances)
+        new_instances = []
+        for cls in classes:
+            instance = instances.get(cls) or _create_instance(cls, *args,
+                                                              **kwargs)
+            if instance:
+                new_instances.append(instance)
+        new_instances += _create_lazy_instances(lazy, *args, **kwargs)
+
+        registry = Registry(new_instances)
+
+        # Stop scheduling the old poll instances
+        _cancel_polls()
+
+        Plugin._plugin_classes = classes
+        _registry = registry
 
 
 def active_plugins():
     """Get the loaded plugin names"""
-    return ", ".join(sorted([x.__name__ for x in Plugin._plugin_classes]))
+    return ", ".join(sorted([x.__name__ for x in active_plugin_classes()]))
 
 
 def active_plugin_classes():
-    """Get the loaded plugin classes"""
-    return Plugin._plugin_classes
+    """Get the loaded plugin classes, including the stand-ins of plugins
+    that haven't been imported yet
+    """
+    return [x.__class__ for x in _registry.instances]
+
+
+def cancelled():
+    """Return whether the running hook has missed its deadline.  Long
+    running hooks should check this and stop early when it's True.
+    """
+    deadline = executor.current_deadline()
+    return deadline is not None and deadline.cancelled()
+
+
+def _build_deadline(session, func, message):
+    """Create the deadline for a single call to a hook."""
+    timeout = getattr(func, "_hook_timeout", None)
+    reply = getattr(func, "_hook_timeout_reply", None)
+
+    config = utils.get_config()
+    if timeout is None:
+        timeout = config.get("hook_timeout", type="int", default=60)
+    if reply is None:
+        reply = config.get("hook_timeout_reply", type="bool", default=False)
+
+    return executor.Deadline(func.__name__, timeout, message, reply,
+                             session.log, _has_priority(session, func,
+                                                        message))
+
+
+def _is_admin(session, message):
+    """Return whether a message comes from an admin."""
+    return getattr(message, "source", None) in getattr(session, "admins", ())
+
+
+def _has_priority(session, func, message):
+    """Return whether a hook's replies should go out first: those to admins
+    and those of priority plugins.
+    """
+    instance = getattr(func, "__self__", None)
+    return _is_admin(session, message) or getattr(instance, "priority",
+                                                  False)
+
+
+def _rate_allowed(session, func, message, private):
+    """Check a hook call against the rate limits.  Only commands are
+    charged, as a single line can set off any number of keyword and
+    msg_regex hooks.  Admins are exempt.
+    """
+    if not getattr(func, "_is_command_hook", False):
+        return True
+
+    if _is_admin(session, message):
+        return True
+
+    source = getattr(message, "source", None)
+    target = None if private else getattr(message, "target", None)
+    return ratelimit.get_limiter().allow(source, target, func.__name__)
 
 
 def run_hook_command(session, mod_name, func, message, arg, **kwargs):
     """Make a call to a plugin hook."""
+    if message and not _rate_allowed(session, func, message,
+                                     kwargs.get("private")):
+        return
+
+    deadline = _build_deadline(session, func, message)
+    previous = executor.current_deadline()
     try:
         if arg:
             session.log.debug("Calling: %s.%s(\"%s\")" % (mod_name,
@@ -249,23 +622,45 @@ def run_hook_command(session, mod_name, func, message, arg, **kwargs):
         else:
             session.log.debug("Calling: %s.%s(None)" % (mod_name,
                               func.__name__))
+        executor.set_deadline(deadline)
         func(message, arg, **kwargs)
     except Exception, exc:
         session.log.exception(exc)
+    finally:
+        executor.set_deadline(previous)
+
+    if deadline.expired():
+        deadline.timed_out()
 
 
 def run_hook_polls(session):
-    """Run polls in the background."""
+    """Schedule the poll hooks to run in the background."""
     message = None
+    pool = executor.get_executor(session.log.name)
+    poll_scheduler = scheduler.get_scheduler()
+
     for mod_name, func, cmd in hook_get_polls():
-        run_hook_command(session, mod_name, func, message, cmd)
+        call = functools.partial(run_hook_command, session, mod_name, func,
+                                 message, cmd)
+        _polls.append(poll_scheduler.add(cmd, call, func._poll_timer, pool))
+
+
+def _cancel_polls():
+    """Cancel all of the scheduled poll hooks."""
+    for poll in _polls:
+        poll.cancel()
+    del _polls[:]
 
 
 def run_msg_regexp_hooks(session, message, private):
     """Run regexp hooks."""
     msg = message.message
-    for mod_name, func, msg_regex in hook_get_msg_regexs():
-        match = re.search(msg_regex, msg, re.I)
+    msg_lower = msg.lower()
+    for mod_name, func, regex, hints in _registry.msg_regexs:
+        if hints and not any(x in msg_lower for x in hints):
+            continue
+
+        match = regex.search(msg)
         if match:
             run_hook_command(session, mod_name, func, message, match,
                              private=private)
@@ -273,50 +668,90 @@ def run_msg_regexp_hooks(session, message, private):
 
 def run_keyword_hooks(session, message, private):
     """Run keyword hooks."""
-    msg = message.message
-    words = msg.split(" ")
-    for mod_name, func, kwarg in hook_get_keywords():
-        for word in words:
-            match = re.search("^%s(.+)" % kwarg, word, re.I)
-            if match:
-                run_hook_command(session, mod_name, func, message,
-                                 match.group(1), private=private)
+    registry = _registry
+    if not registry.keyword_trie:
+        return
+
+    hits = {}
+    for word in message.message.split(" "):
+        for keyword, params in _keyword_hits(registry.keyword_trie, word):
+            hits.setdefault(keyword, []).append(params)
+
+    if not hits:
+        return
+
+    # NOTE(agent): Every keyword a word starts with fires, e.g. "lpx9" runs
+    # both "lp" with "x9" and "lpx" with "9", one hook at a time.
+    for mod_name, func, kwarg in registry.hooks["keyword"]:
+        for params in hits.get(kwarg.lower(), []):
+            run_hook_command(session, mod_name, func, message, params,
+                             private=private)
+
+
+def _keyword_hits(trie, word):
+    """Yield each (keyword, params) pair for the keywords a word starts
+    with.  The params are the rest of the word, up to any line break.
+    """
+    node = trie
+    for i, char in enumerate(word.lower()):
+        node = node.get(char)
+        if node is None:
+            return
+
+        keyword = node.get(None)
+        if keyword is not None:
+            params = word[i + 1:].split("\n", 1)[0]
+            if params:
+                yield keyword, params
+
+
+def _split_command(msg):
+    """Split a message into its lower-cased command and its parameters."""
+    match = _COMMAND_RE.search(msg)
+    if not match:
+        return None, None
+    return match.group(1).lower(), match.group(2)
+
+
+def _strip_command_prefix(session, msg):
+    """Return the rest of the message if it was directed at the bot, either
+    with the command prefix or by addressing the bot's nick.  Sets
+    session.addressed when the nick was used.
+    """
+    if msg.startswith(session.command_prefix):
+        # Strip off command prefix
+        return msg[len(session.command_prefix):]
+
+    # Check for command starting with nick being addressed
+    msg_start_upper = msg[:len(session.nick) + 1].upper()
+    if msg_start_upper == session.nick.upper() + ":":
+        session.addressed = True
+        # Get rest of string after "nick:" and white spaces
+        return msg[len(session.nick) + 1:].lstrip()
+
+    return None
 
 
 def run_command_hooks(session, message, private):
     """Run command hooks."""
     msg = message.message
-    for mod_name, func, cmd in hook_get_commands():
-        session.addressed = False
-
-        if private:
-            match = re.search("^%s$|^%s\s(.*)$" % (cmd, cmd), msg,
-                              re.I)
-            if match:
-                run_hook_command(session, mod_name, func, message,
-                                 match.group(1), private=private,
-                                 addressed=session.addressed)
-
-        if msg.startswith(session.command_prefix):
-            # Strip off command prefix
-            msg_rest = msg[len(session.command_prefix):]
-        else:
-            # Check for command starting with nick being addressed
-            msg_start_upper = msg[:len(session.nick) + 1].upper()
-            if msg_start_upper == session.nick.upper() + ":":
-                # Get rest of string after "nick:" and white spaces
-                msg_rest = re.sub("^\s+", "",
-                                  msg[len(session.nick) + 1:])
-            else:
-                continue
+    commands = _registry.commands
+    session.addressed = False
 
-            session.addressed = True
+    if private:
+        cmd, params = _split_command(msg)
+        for mod_name, func, _cmd in commands.get(cmd, []):
+            run_hook_command(session, mod_name, func, message, params,
+                             private=private, addressed=False)
 
-        match = re.search("^%s$|^%s\s(.*)$" % (cmd, cmd), msg_rest, re.I)
-        if match:
-            run_hook_command(session, mod_name, func, message, match.group(1),
-                             private=private,
-                             addressed=session.addressed)
+    msg_rest = _strip_command_prefix(session, msg)
+    if msg_rest is None:
+        return
+
+    cmd, params = _split_command(msg_rest)
+    for mod_name, func, _cmd in commands.get(cmd, []):
+        run_hook_command(session, mod_name, func, message, params,
+                         private=private, addressed=session.addressed)
 
 
 def poll_messages(session, message, private=False):
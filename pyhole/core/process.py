@@ -15,7 +15,10 @@
 """Pyhole Network Connections"""
 
 import multiprocessing
+import signal
+import sys
 
+from pyhole.core import logger
 from pyhole.core import utils
 
 
@@ -27,6 +30,12 @@ class Process(multiprocessing.Process):
 
     def run(self):
         """Run the network connection."""
+        # NOTE(agent): A handled signal interrupts the reactor's select()
+        # with EINTR, which nothing retries, so SIGHUP is ignored here.  The
+        # configuration is still re-read once the file changes on disk.
+        signal.signal(signal.SIGHUP, signal.SIG_IGN)
+        signal.signal(signal.SIGTERM, _terminate)
+
         network_config = utils.get_config(self.network)
         if network_config.get("api_token", default=None):
             from pyhole.core.slack import client
@@ -34,4 +43,12 @@ class Process(multiprocessing.Process):
             from pyhole.core.irc import client
 
         connection = client.Client(self.network)
-        connection.start()
+        try:
+            connection.start()
+        finally:
+            logger.flush()
+
+
+def _terminate(*_args):
+    """Exit cleanly, so that queued log records get written."""
+    sys.exit(0)
@@ -12,40 +12,118 @@
 #   See the License for the specific language governing permissions and
 #   limitations under the License.
 
-"""Pyhole Message Queue"""
+"""Pyhole Message Queue
 
+Messages from the API are routed to the network they are meant for when
+they are queued.  Each network has its own queue, read by a single thread
+in that network's process.  The queues have to exist before the network
+processes are started, so Main creates the broker first.
+"""
+
+import logging
 import multiprocessing
+import os
+import threading
 
 import utils
 
 
-QUEUE = multiprocessing.Queue()
+_broker = None
+_broker_lock = threading.Lock()
+
+
+class MessageBroker(object):
+    """One message queue per network."""
 
+    def __init__(self, networks):
+        self.log = logging.getLogger()
+        self.unroutable = multiprocessing.Value("i", 0)
 
-class MessageQueue(object):
-    """Global message queue."""
+        self._queues = {}
+        self._depths = {}
+        for network in networks:
+            self._queues[network] = multiprocessing.Queue()
+            self._depths[network] = multiprocessing.Value("i", 0)
 
-    def __init__(self):
-        self.queue = QUEUE
+        self._sessions = {}
+        self._watchers = {}
+        self._lock = threading.Lock()
 
     def put(self, item):
-        """Place an item into the queue."""
-        self.queue.put_nowait(item)
+        """Route a (network, target, message) item to its network."""
+        network = item[0]
+        if network not in self._queues:
+            with self.unroutable.get_lock():
+                self.unroutable.value += 1
+            self.log.warning("No such network for queued message: %s" %
+                             network)
+            return False
+
+        # NOTE(agent): Count it before it can be taken, so the depth never
+        # drops below zero.
+        depth = self._depths[network]
+        with depth.get_lock():
+            depth.value += 1
+        self._queues[network].put_nowait(item)
+        return True
+
+    def get(self, network):
+        """Wait for the next item of a network."""
+        item = self._queues[network].get()
+        depth = self._depths[network]
+        with depth.get_lock():
+            depth.value -= 1
+        return item
 
-    @utils.spawn
     def watch(self, session):
-        """Watch the queue for incoming messages."""
+        """Deliver the messages of a session's network to it.  Only one
+        thread per network ever reads its queue, however many times the
+        session reconnects; it delivers to the latest session.
+        """
+        network = session.log.name
+        if network not in self._queues:
+            return
+
+        with self._lock:
+            self._sessions[network] = session
+            if self._watchers.get(network) == os.getpid():
+                return
+            self._watchers[network] = os.getpid()
+
+        t = threading.Thread(target=self._watch, args=(network,),
+                             name="queue-%s" % network)
+        t.setDaemon(True)
+        t.start()
+
+    def _watch(self, network):
+        """Deliver queued items for a network until the process exits."""
         while True:
-            item = self.queue.get()
+            try:
+                _network, target, msg = self.get(network)
+            except (EOFError, IOError):
+                # NOTE(agent): The queue was closed, the process is exiting.
+                return
+
+            session = self._sessions[network]
+            try:
+                session.reply(target, msg)
+            except Exception, exc:
+                session.log.exception(exc)
+
+    def stats(self):
+        """Return the depth of each network's queue."""
+        stats = {"unroutable": self.unroutable.value}
+        for network, depth in self._depths.iteritems():
+            stats[network] = depth.value
+        return stats
 
-            actual_network = session.log.name
-            intended_network = item[0]
 
-            # NOTE(jk0): If the intended network does not match the actual
-            # network, place the item back into the queue until it gets
-            # picked up by the intended network.
-            if actual_network != intended_network:
-                self.queue.put(item)
-                continue
+def get_broker():
+    """Return the message broker, creating it if needed."""
+    global _broker
 
-            session.reply(item[1], item[2])
+    with _broker_lock:
+        if _broker is None:
+            networks = utils.get_config().get("networks", type="list")
+            _broker = MessageBroker(networks)
+        return _broker
@@ -0,0 +1,148 @@
+#   Copyright 2026 agent
+#
+#   Licensed under the Apache License, Version 2.0 (the "License");
+#   you may not use this file except in compliance with the License.
+#   You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS,
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#   See the License for the specific language governing permissions and
+#   limitations under the License.
+
+"""Pyhole Rate Limiting
+
+Commands are limited to user_rate_limit (5) per user, channel_rate_limit
+(20) per channel and command_rate_limit (3) per user and command, every
+rate_limit_period (10) seconds.  Keyword and msg_regex hooks are not
+limited.
+"""
+
+import threading
+import time
+
+import utils
+
+
+_limiter = None
+_limiter_lock = threading.Lock()
+
+
+class TokenBuckets(object):
+    """Token buckets sharing one refill rate, keyed by anything hashable.
+
+    Each bucket is stored as a (tokens, timestamp) tuple.  A bucket that
+    has been idle long enough to refill is the same as no bucket at all,
+    so those are expired instead of being kept around.
+    """
+
+    def __init__(self, limit, period):
+        self.limit = limit
+        self.period = period
+        self.rate = float(limit) / period
+        self.buckets = {}
+
+    def peek(self, key, now):
+        """Return the tokens available in a bucket."""
+        bucket = self.buckets.get(key)
+        if bucket is None:
+            return self.limit
+
+        tokens, stamp = bucket
+        return min(self.limit, tokens + (now - stamp) * self.rate)
+
+    def take(self, key, tokens, now):
+        """Spend a token from a bucket previously peeked at."""
+        self.buckets[key] = (tokens - 1, now)
+
+    def expire(self, now):
+        """Forget the buckets that have refilled."""
+        self.buckets = dict((k, v) for k, v in self.buckets.iteritems()
+                            if now - v[1] < self.period)
+
+
+class RateLimiter(object):
+    """Limit how often hooks run per user, per channel and per user and
+    command.  A call is only charged if every bucket it falls in has a
+    token to spare, and refused calls just bump a counter.
+    """
+
+    def __init__(self, user_limit=5, channel_limit=20, command_limit=3,
+                 period=10):
+        self.period = period
+        self.limited = 0
+
+        self._buckets = []
+        for kind, limit in (("user", user_limit),
+                            ("channel", channel_limit),
+                            ("command", command_limit)):
+            if limit:
+                self._buckets.append((kind, TokenBuckets(limit, period)))
+
+        self._lock = threading.Lock()
+        self._next_expiry = 0
+
+    def _keys(self, source, target, command):
+        """Return the bucket key for each kind of limit."""
+        return {
+            "user": source,
+            "channel": target,
+            "command": (source, command)
+        }
+
+    def allow(self, source, target, command, now=None):
+        """Return whether a hook may run, charging it if so.  The target is
+        None for private messages.
+        """
+        if not self._buckets:
+            return True
+
+        now = now or time.time()
+        keys = self._keys(source, target, command)
+
+        with self._lock:
+            if now >= self._next_expiry:
+                for _kind, buckets in self._buckets:
+                    buckets.expire(now)
+                self._next_expiry = now + self.period
+
+            charges = []
+            for kind, buckets in self._buckets:
+                key = keys[kind]
+                if key is None:
+                    continue
+
+                tokens = buckets.peek(key, now)
+                if tokens < 1:
+                    self.limited += 1
+                    return False
+                charges.append((buckets, key, tokens))
+
+            for buckets, key, tokens in charges:
+                buckets.take(key, tokens, now)
+
+        return True
+
+    def stats(self):
+        """Return the current rate limiting statistics."""
+        stats = {"limited": self.limited}
+        for kind, buckets in self._buckets:
+            stats[kind] = len(buckets.buckets)
+        return stats
+
+
+def get_limiter():
+    """Return the rate limiter, creating it if needed."""
+    global _limiter
+
+    with _limiter_lock:
+        if _limiter is None:
+            config = utils.get_config()
+            _limiter = RateLimiter(
+                config.get("user_rate_limit", type="int", default=5),
+                config.get("channel_rate_limit", type="int", default=20),
+                config.get("command_rate_limit", type="int", default=3),
+                config.get("rate_limit_period", type="int", default=10))
+        return _limiter
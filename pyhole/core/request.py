@@ -15,31 +15,98 @@
 """Pyhole Request Manager"""
 
 import requests
+import threading
 
+import executor
 import version
 
 
+DEFAULT_TIMEOUT = 30
+
+_flights = {}
+_flights_lock = threading.Lock()
+
 session = requests.Session()
 session.headers.update({
     "User-Agent": "pyhole/%s" % version.version()
 })
 
 
+def _timeout():
+    """Never wait on a request longer than the running hook's deadline."""
+    deadline = executor.current_deadline()
+    remaining = deadline.remaining() if deadline else None
+    if remaining is None:
+        return DEFAULT_TIMEOUT
+    return max(min(remaining, DEFAULT_TIMEOUT), 1)
+
+
 def get(url, **kwargs):
     """GET a URL."""
+    kwargs.setdefault("timeout", _timeout())
     return session.get(url, **kwargs)
 
 
 def post(url, **kwargs):
     """POST to a URL."""
+    kwargs.setdefault("timeout", _timeout())
     return session.post(url, **kwargs)
 
 
 def put(url, **kwargs):
     """PUT to a URL."""
+    kwargs.setdefault("timeout", _timeout())
     return session.put(url, **kwargs)
 
 
+class _Flight(object):
+    """A call in progress that other callers can wait on."""
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+def single_flight(key, func, *args, **kwargs):
+    """Call func, unless a call for the same key is already in progress, in
+    which case wait for it and share its result (or its exception).
+    """
+    with _flights_lock:
+        flight = _flights.get(key)
+        leader = flight is None
+        if leader:
+            flight = _flights[key] = _Flight()
+
+    if not leader:
+        if not flight.done.wait(_timeout()):
+            raise requests.exceptions.Timeout("Timed out waiting for %s" %
+                                              func.__name__)
+        if flight.error:
+            raise flight.error
+        return flight.result
+
+    try:
+        flight.result = func(*args, **kwargs)
+    except Exception, exc:
+        flight.error = exc
+        raise
+    finally:
+        with _flights_lock:
+            del _flights[key]
+        flight.done.set()
+
+    return flight.result
+
+
+def shared_get(url, **kwargs):
+    """GET a URL, sharing the response with anyone making the same request
+    at the same time.
+    """
+    key = ("GET", url, repr(sorted(kwargs.items())))
+    return single_flight(key, get, url, **kwargs)
+
+
 def ok(request):
     """Check if a request is OK (2xx)."""
     return request.status_code >= 200 and request.status_code < 300
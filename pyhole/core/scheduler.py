@@ -0,0 +1,147 @@
+#   Copyright 2026 agent
+#
+#   Licensed under the Apache License, Version 2.0 (the "License");
+#   you may not use this file except in compliance with the License.
+#   You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS,
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#   See the License for the specific language governing permissions and
+#   limitations under the License.
+
+"""Pyhole Poll Scheduler"""
+
+import heapq
+import itertools
+import logging
+import os
+import random
+import threading
+import time
+
+import utils
+
+
+_scheduler = None
+_scheduler_lock = threading.Lock()
+
+
+class Poll(object):
+    """A function that runs every 'interval' seconds."""
+
+    def __init__(self, name, func, interval, pool):
+        self.name = name
+        self.func = func
+        self.interval = interval
+        self.pool = pool
+        self.running = False
+        self.cancelled = False
+        self.skipped = 0
+
+    def cancel(self):
+        """Stop the poll from being run again."""
+        self.cancelled = True
+
+
+class Scheduler(object):
+    """A single thread driving a heap of poll deadlines.  Due polls are
+    handed to a worker pool; a poll that is still running when it comes
+    due again is skipped rather than run twice.
+    """
+
+    def __init__(self, jitter=0.1):
+        self.jitter = jitter
+        self.log = logging.getLogger()
+
+        self._heap = []
+        self._counter = itertools.count()
+        self._cond = threading.Condition()
+        self._pid = None
+
+    def _ensure_started(self):
+        """Start the scheduler thread, once per process."""
+        if self._pid == os.getpid():
+            return
+
+        t = threading.Thread(target=self._run, name="scheduler")
+        t.setDaemon(True)
+        t.start()
+        self._pid = os.getpid()
+
+    def _jitter(self, interval):
+        """Return a random offset so that polls don't fire in bursts."""
+        return random.uniform(0, interval * self.jitter)
+
+    def add(self, name, func, interval, pool):
+        """Schedule func to run in the given pool every interval seconds.
+        The first run happens right away, give or take the jitter.
+        """
+        poll = Poll(name, func, interval, pool)
+
+        with self._cond:
+            self._ensure_started()
+            self._push(time.time() + self._jitter(interval), poll)
+
+        return poll
+
+    def _push(self, due, poll):
+        """Place a poll on the heap and wake up the scheduler thread."""
+        heapq.heappush(self._heap, (due, next(self._counter), poll))
+        self._cond.notify()
+
+    def _run(self):
+        """Wait for the next poll to come due and dispatch it."""
+        while True:
+            with self._cond:
+                while not self._heap:
+                    self._cond.wait()
+
+                due, _count, poll = self._heap[0]
+                delay = due - time.time()
+                if delay > 0:
+                    self._cond.wait(delay)
+                    continue
+
+                heapq.heappop(self._heap)
+                if poll.cancelled:
+                    continue
+
+                next_due = max(due, time.time()) + poll.interval
+                self._push(next_due + self._jitter(poll.interval), poll)
+
+            self._dispatch(poll)
+
+    def _dispatch(self, poll):
+        """Hand a poll over to its worker pool."""
+        if poll.running:
+            poll.skipped += 1
+            self.log.warning("Skipping poll %s, the previous run has not "
+                             "finished (%d skipped)" % (poll.name,
+                                                        poll.skipped))
+            return
+
+        poll.running = True
+        if not poll.pool.submit(self._call, poll):
+            poll.running = False
+
+    def _call(self, poll):
+        """Run a poll and mark it as finished."""
+        try:
+            poll.func()
+        finally:
+            poll.running = False
+
+
+def get_scheduler():
+    """Return the poll scheduler, creating it if needed."""
+    global _scheduler
+
+    with _scheduler_lock:
+        if _scheduler is None:
+            config = utils.get_config()
+            jitter = config.get("poll_jitter", type="float", default=0.1)
+            _scheduler = Scheduler(jitter)
+        return _scheduler
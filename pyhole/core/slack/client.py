@@ -63,8 +63,7 @@ class Client(object):
         self.client = slackclient.SlackClient(self.api_token)
         self.client.rtm_connect()
 
-        q = queue.MessageQueue()
-        q.watch(self)
+        queue.get_broker().watch(self)
 
         count = 0
         while True:
@@ -0,0 +1,314 @@
+#   Copyright 2026 agent
+#
+#   Licensed under the Apache License, Version 2.0 (the "License");
+#   you may not use this file except in compliance with the License.
+#   You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS,
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#   See the License for the specific language governing permissions and
+#   limitations under the License.
+
+"""Pyhole Storage
+
+Plugins keep their state in namespaces of string keys and values.  The
+default backend is a SQLite database shared by every network process; the
+"files" backend keeps the old layout of one file per key under
+~/.pyhole/<namespace>/.
+"""
+
+import logging
+import os
+import sqlite3
+import threading
+import time
+
+import utils
+
+
+DATABASE_FILE = "pyhole.db"
+BUSY_TIMEOUT = 10
+# NOTE(agent): How often, in seconds, a cached namespace checks whether
+# another process has changed it.
+CHECK_INTERVAL = 1.0
+
+_store = None
+_namespaces = {}
+_lock = threading.Lock()
+
+
+class FileBackend(object):
+    """One file per key, one directory per namespace."""
+
+    def get(self, namespace, key):
+        """Return the value of a key, or None."""
+        return utils.read_file(namespace, key)
+
+    def put(self, namespace, key, value):
+        """Set the value of a key."""
+        utils.write_file(namespace, key, value)
+
+    def put_many(self, namespace, items):
+        """Set the values of several keys."""
+        for key, value in items:
+            self.put(namespace, key, value)
+
+    def delete(self, namespace, key):
+        """Remove a key."""
+        try:
+            os.remove(utils.get_directory(namespace) + key)
+        except OSError:
+            pass
+
+    def scan(self, namespace, prefix=""):
+        """Return the (key, value) pairs whose key starts with prefix."""
+        return [(key, self.get(namespace, key))
+                for key in sorted(utils.list_files(namespace))
+                if key.startswith(prefix)]
+
+    def version(self, namespace):
+        """Return something that changes whenever a namespace does."""
+        directory = os.path.join(utils.get_home_directory(), namespace)
+        try:
+            return max([os.path.getmtime(directory)] + [
+                os.path.getmtime(os.path.join(directory, x))
+                for x in os.listdir(directory)])
+        except OSError:
+            return None
+
+    def migrate(self, namespace):
+        """Nothing to do, the files are the store."""
+        pass
+
+
+class SQLiteBackend(object):
+    """A SQLite database in WAL mode, so that readers in one network process
+    don't block writers in another.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.log = logging.getLogger()
+        self._local = threading.local()
+
+    def _connect(self):
+        """Return this thread's connection, opening it if needed."""
+        conn = getattr(self._local, "conn", None)
+        if conn and self._local.pid == os.getpid():
+            return conn
+
+        # NOTE(agent): isolation_level=None leaves transactions to us, so
+        # batched writes and migrations can take the write lock up front.
+        conn = sqlite3.connect(self.path, timeout=BUSY_TIMEOUT,
+                               isolation_level=None)
+        conn.text_factory = str
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.execute("CREATE TABLE IF NOT EXISTS kv (namespace TEXT, "
+                     "key TEXT, value TEXT, PRIMARY KEY (namespace, key))")
+        conn.execute("CREATE TABLE IF NOT EXISTS migrations "
+                     "(namespace TEXT PRIMARY KEY)")
+        conn.execute("CREATE TABLE IF NOT EXISTS versions "
+                     "(namespace TEXT PRIMARY KEY, version INTEGER)")
+        # NOTE(agent): Every write bumps the version of its namespace, so
+        # other processes can tell their cached copy is stale.
+        for event, row in (("insert", "new"), ("delete", "old")):
+            conn.execute(
+                "CREATE TRIGGER IF NOT EXISTS kv_{0} AFTER {0} ON kv BEGIN "
+                "INSERT OR REPLACE INTO versions VALUES ({1}.namespace, "
+                "COALESCE((SELECT version FROM versions WHERE namespace = "
+                "{1}.namespace), 0) + 1); END".format(event, row))
+
+        self._local.conn = conn
+        self._local.pid = os.getpid()
+        return conn
+
+    def get(self, namespace, key):
+        """Return the value of a key, or None."""
+        row = self._connect().execute(
+            "SELECT value FROM kv WHERE namespace = ? AND key = ?",
+            (namespace, key)).fetchone()
+        return row[0] if row else None
+
+    def put(self, namespace, key, value):
+        """Set the value of a key."""
+        self._connect().execute(
+            "INSERT OR REPLACE INTO kv VALUES (?, ?, ?)",
+            (namespace, key, str(value).strip()))
+
+    def put_many(self, namespace, items):
+        """Set the values of several keys in a single transaction."""
+        conn = self._connect()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            conn.executemany("INSERT OR REPLACE INTO kv VALUES (?, ?, ?)",
+                             [(namespace, key, str(value).strip())
+                              for key, value in items])
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        conn.execute("COMMIT")
+
+    def delete(self, namespace, key):
+        """Remove a key."""
+        self._connect().execute(
+            "DELETE FROM kv WHERE namespace = ? AND key = ?",
+            (namespace, key))
+
+    def scan(self, namespace, prefix=""):
+        """Return the (key, value) pairs whose key starts with prefix."""
+        # NOTE(agent): A range query, unlike LIKE, can use the primary key.
+        return self._connect().execute(
+            "SELECT key, value FROM kv WHERE namespace = ? AND key >= ? "
+            "AND key < ? ORDER BY key",
+            (namespace, prefix, prefix + "\xff")).fetchall()
+
+    def version(self, namespace):
+        """Return something that changes whenever a namespace does."""
+        row = self._connect().execute(
+            "SELECT version FROM versions WHERE namespace = ?",
+            (namespace,)).fetchone()
+        return row[0] if row else None
+
+    def migrate(self, namespace):
+        """Import the files of a namespace the first time it is used.  The
+        files are left where they are.
+        """
+        conn = self._connect()
+        if conn.execute("SELECT 1 FROM migrations WHERE namespace = ?",
+                        (namespace,)).fetchone():
+            return
+
+        directory = os.path.join(utils.get_home_directory(), namespace)
+        items = []
+        if os.path.isdir(directory):
+            for key in os.listdir(directory):
+                value = utils.read_file(namespace, key)
+                if value is not None:
+                    items.append((namespace, key, value.strip()))
+
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            # NOTE(agent): Another network process may have beaten us to it.
+            if not conn.execute("SELECT 1 FROM migrations WHERE "
+                                "namespace = ?", (namespace,)).fetchone():
+                conn.executemany("INSERT OR IGNORE INTO kv VALUES (?, ?, ?)",
+                                 items)
+                conn.execute("INSERT INTO migrations VALUES (?)",
+                             (namespace,))
+                if items:
+                    self.log.info("Migrated %d %s files" % (len(items),
+                                                            namespace))
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        conn.execute("COMMIT")
+
+
+class Namespace(object):
+    """The keys and values of a single plugin.
+
+    A cached namespace is also kept in memory, for lookups in hot paths.
+    Writes go through to the store, and the copy in memory is loaded again
+    when the store's version of the namespace changes, which is checked at
+    most every CHECK_INTERVAL seconds.
+    """
+
+    def __init__(self, store, name, cached=False):
+        self.store = store
+        self.name = name
+        self.cache = None
+
+        self._version = None
+        self._checked = 0
+
+        store.migrate(name)
+        if cached:
+            self.load_cache()
+
+    def load_cache(self):
+        """Load the whole namespace into memory."""
+        # NOTE(agent): Read the version first, so a write made during the
+        # scan makes the next check load it again.
+        self._version = self.store.version(self.name)
+        self._checked = time.time()
+        self.cache = dict(self.store.scan(self.name))
+
+    def _check_cache(self):
+        """Load the namespace again if another process has changed it."""
+        now = time.time()
+        if now - self._checked < CHECK_INTERVAL:
+            return
+
+        self._checked = now
+        if self.store.version(self.name) != self._version:
+            self.load_cache()
+
+    def get(self, key):
+        """Return the value of a key, or None."""
+        if self.cache is None:
+            return self.store.get(self.name, key)
+
+        self._check_cache()
+        value = self.cache.get(key)
+        if value is None:
+            value = self.store.get(self.name, key)
+            if value is not None:
+                self.cache[key] = value
+        return value
+
+    def put(self, key, value):
+        """Set the value of a key."""
+        self.store.put(self.name, key, value)
+        if self.cache is not None:
+            self.cache[key] = str(value).strip()
+
+    def put_many(self, items):
+        """Set the values of several (key, value) pairs at once."""
+        items = [(key, str(value).strip()) for key, value in items]
+        self.store.put_many(self.name, items)
+        if self.cache is not None:
+            self.cache.update(items)
+
+    def delete(self, key):
+        """Remove a key."""
+        self.store.delete(self.name, key)
+        if self.cache is not None:
+            self.cache.pop(key, None)
+
+    def scan(self, prefix=""):
+        """Return the (key, value) pairs whose key starts with prefix."""
+        if self.cache is None:
+            return self.store.scan(self.name, prefix)
+
+        self._check_cache()
+        return sorted(x for x in self.cache.iteritems()
+                      if x[0].startswith(prefix))
+
+
+def _build_store():
+    """Create the configured storage backend."""
+    backend = utils.get_config().get("storage_backend", default="sqlite")
+    if backend == "files":
+        return FileBackend()
+
+    return SQLiteBackend(utils.get_home_directory() + DATABASE_FILE)
+
+
+def get_namespace(name, cached=False):
+    """Return a namespace, creating the store if needed."""
+    global _store
+
+    with _lock:
+        if _store is None:
+            _store = _build_store()
+
+        namespace = _namespaces.get(name)
+        if namespace is None:
+            namespace = _namespaces[name] = Namespace(_store, name, cached)
+        elif cached and namespace.cache is None:
+            namespace.load_cache()
+        return namespace
@@ -15,7 +15,9 @@
 """Pyhole "Utilities"""
 
 import argparse
+import collections
 import datetime
+import errno
 import os
 import re
 import shutil
@@ -24,9 +26,15 @@ import threading
 from BeautifulSoup import BeautifulStoneSoup
 
 import config
+import executor
 import version
 
 
+Options = collections.namedtuple("Options", ["config", "debug"])
+
+_options = None
+
+
 def admin(func):
     """Require admin rights."""
     def wrap(self, message, *args, **kwargs):
@@ -57,7 +65,42 @@ def require_params(func):
 
 
 def spawn(func):
-    """Thread-spawning decorator."""
+    """Worker pool decorator.  Calls are submitted to the worker pool of
+    the network the plugin belongs to, through the plugin's bulkhead.
+    """
+    def wrap(*args, **kwargs):
+        pool = executor.get_executor(_pool_name(args))
+        bulkhead = getattr(args[0], "bulkhead", None) if args else None
+        if bulkhead:
+            accepted = bulkhead.submit(pool, func, *args, **kwargs)
+        else:
+            accepted = pool.submit(func, *args, **kwargs)
+
+        if not accepted and pool.policy == "reject":
+            for arg in args:
+                if hasattr(arg, "dispatch"):
+                    arg.dispatch("Sorry, I'm too busy right now. Please try "
+                                 "again later.")
+                    break
+
+    wrap.__doc__ = func.__doc__
+    wrap.__name__ = func.__name__
+    wrap.__module__ = func.__module__
+
+    return wrap
+
+
+def _pool_name(args):
+    """Find the network name of the plugin making the call."""
+    session = getattr(args[0], "session", None) if args else None
+    log = getattr(session, "log", None)
+    return log.name if log else "Pyhole"
+
+
+def spawn_thread(func):
+    """Thread-spawning decorator.  Only use this for long running loops;
+    everything else belongs in the worker pool (see spawn).
+    """
     def wrap(*args, **kwargs):
         t = threading.Thread(target=func, args=args, kwargs=kwargs)
         t.setDaemon(True)
@@ -78,6 +121,37 @@ def decode_entities(html):
     return filter(lambda x: ord(x) > 9 and ord(x) < 127, html)
 
 
+def split_utf8(text, max_bytes):
+    """Split text into chunks of at most max_bytes bytes of UTF-8, breaking
+    at a space where there is one in the second half of a chunk and never
+    inside a character.  Unicode text is split into unicode chunks.
+    """
+    is_unicode = isinstance(text, unicode)
+    data = text.encode("utf-8") if is_unicode else text
+    # NOTE(agent): Room for the longest character, so every chunk has one.
+    max_bytes = max(max_bytes, 4)
+
+    chunks = []
+    while len(data) > max_bytes:
+        cut = data.rfind(" ", 0, max_bytes + 1)
+        if cut > max_bytes // 2:
+            chunks.append(data[:cut])
+            data = data[cut + 1:]
+            continue
+
+        cut = max_bytes
+        while cut and 0x80 <= ord(data[cut]) < 0xc0:
+            cut -= 1
+        cut = cut or max_bytes
+        chunks.append(data[:cut])
+        data = data[cut:]
+    chunks.append(data)
+
+    if is_unicode:
+        return [x.decode("utf-8") for x in chunks]
+    return chunks
+
+
 def ensure_int(param):
     """Ensure the given param is an int."""
     try:
@@ -97,15 +171,23 @@ def build_options():
     return parser.parse_known_args()[0]
 
 
+def get_options():
+    """Return the command line options, parsing them the first time."""
+    global _options
+
+    if _options is None:
+        _options = Options(**vars(build_options()))
+    return _options
+
+
 def get_option(option):
     """Retrive an option from the command line."""
-    parsed_args = build_options()
-    return vars(parsed_args).get(option)
+    return getattr(get_options(), option, None)
 
 
 def debug_enabled():
     """Return whether or not debug mode is enabled."""
-    debug_option = get_option("debug")
+    debug_option = get_options().debug
     debug_config = get_config().get("debug", type="bool")
     return debug_option or debug_config
 
@@ -128,7 +210,12 @@ def get_directory(new_dir):
 def make_directory(directory):
     """Make a direectory if it doesn't exist."""
     if not os.path.exists(directory):
-        os.makedirs(directory)
+        try:
+            os.makedirs(directory)
+        except OSError, exc:
+            # NOTE(agent): Another thread or process may have just made it.
+            if exc.errno != errno.EEXIST:
+                raise
 
 
 def get_conf_file_path():
@@ -152,7 +239,7 @@ def get_conf_file():
 
 def get_config(section="Pyhole"):
     """Return the default config object."""
-    return config.Config(get_conf_file(), section)
+    return config.get_config(get_conf_file(), section)
 
 
 def write_file(directory, file_name, data):
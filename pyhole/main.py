@@ -17,8 +17,10 @@
 import time
 
 from pyhole.core import api
+from pyhole.core import config as pyhole_config
 from pyhole.core import logger
 from pyhole.core import process
+from pyhole.core import queue
 from pyhole.core import utils
 from pyhole.core import version
 
@@ -32,12 +34,25 @@ def Main():
     log.info("Starting %s..." % version.version_string())
     log.info("Connecting to networks: %s" % ", ".join(networks))
 
+    # NOTE(agent): The network processes need the message queues, so they
+    # have to be created before any process is started.
+    queue.get_broker()
+
     procs = []
     for network in networks:
         proc = process.Process(network)
         proc.start()
         procs.append(proc)
 
+    def reload_config(*_args):
+        """Reload the configuration.  The network processes aren't
+        signalled; they pick up changes to the file on their own.
+        """
+        log.info("Reloading configuration")
+        pyhole_config.reload()
+
+    pyhole_config.install_reload_handler(reload_config)
+
     try:
         if config.get("api_enabled", type="bool"):
             api.run()
@@ -54,3 +69,5 @@ def Main():
     except KeyboardInterrupt:
         for proc in procs:
             proc.terminate()
+    finally:
+        logger.flush()
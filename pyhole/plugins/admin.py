@@ -14,6 +14,9 @@
 
 """Pyhole Administration Plugin"""
 
+import time
+
+from pyhole.core import history
 from pyhole.core import plugin
 from pyhole.core import utils
 
@@ -102,6 +105,54 @@ class Admin(plugin.Plugin):
         (target, msg) = params.split(" ", 1)
         self.session.reply(target, msg)
 
+    @plugin.hook_add_command("grep")
+    @utils.admin
+    @utils.require_params
+    @utils.spawn
+    def grep(self, message, params=None, **kwargs):
+        """Search the chat history (ex: .grep <words>)."""
+        rows = history.get_index().search(
+            self.session.log.name, params, limit=5,
+            channel=_history_channel(message, kwargs.get("private")))
+        if not rows:
+            message.dispatch("No matches found.")
+            return
+
+        message.dispatch(_format_history(rows))
+
+    @plugin.hook_add_command("last")
+    @utils.admin
+    @utils.spawn
+    def last(self, message, params=None, **kwargs):
+        """Show the latest chat history (ex: .last [<count>])."""
+        limit = max(1, min(params and utils.ensure_int(params) or 5, 10))
+        rows = history.get_index().last(
+            self.session.log.name, limit=limit,
+            channel=_history_channel(message, kwargs.get("private")))
+        if rows:
+            message.dispatch(_format_history(rows))
+
+
+def _history_channel(message, private):
+    """Return the channel whose history may be shown in reply to a message.
+    Private messages, answered only to the admin, may see all of it.
+    """
+    if private:
+        return None
+
+    # NOTE(agent): Slack channels are logged with a "#" but named without.
+    channel = message.target
+    return channel if channel[:1] in "#&" else "#" + channel
+
+
+def _format_history(rows):
+    """Format the newest first history rows, oldest first."""
+    lines = []
+    for created, line in reversed(rows):
+        created = time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(created))
+        lines.append("%s %s" % (created, line))
+    return "\n".join(lines)
+
 
 def _find_doc_string(params):
     """Find the doc string for a plugin, command or keyword hook."""
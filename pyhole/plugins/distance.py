@@ -18,12 +18,17 @@ import pywunderground
 
 from pyhole.core import plugin
 from pyhole.core import request
+from pyhole.core import storage
 from pyhole.core import utils
 
 
 class Distance(plugin.Plugin):
     """Display distance between two users by using their weather data."""
 
+    def __init__(self, session):
+        super(Distance, self).__init__(session)
+        self.locations = _load_locations()
+
     @plugin.hook_add_command("distance")
     @utils.require_params
     @utils.spawn
@@ -48,14 +53,8 @@ class Distance(plugin.Plugin):
         else:
             origin_nick = message.source.split("!")[0]
 
-        dest = None
-        origin = None
-        for filename in utils.list_files("Wunderground"):
-            nick = filename.split("!")[0]
-            if nick == dest_nick:
-                dest = utils.read_file("Wunderground", filename)
-            if nick == origin_nick:
-                origin = utils.read_file("Wunderground", filename)
+        dest = self.locations.get(dest_nick)
+        origin = self.locations.get(origin_nick)
 
         if not dest:
             # They passed in a location
@@ -85,6 +84,19 @@ class Distance(plugin.Plugin):
         message.dispatch(msg)
 
 
+def _load_locations():
+    """Load the nick to location index into memory, building it from the
+    saved Wunderground locations the first time.
+    """
+    locations = storage.get_namespace("WundergroundNicks", cached=True)
+    if not locations.cache:
+        saved = storage.get_namespace("Wunderground").scan()
+        locations.put_many((source.split("!")[0], location)
+                           for source, location in saved)
+
+    return locations
+
+
 def _resolve_pws(location):
     """Look up the location of a PWS."""
     if location.lower().startswith("pws:"):
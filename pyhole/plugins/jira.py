@@ -31,8 +31,8 @@ class JiraClient(object):
     def get(self, issue_id):
         url = "%s/rest/api/latest/issue/%s" % (self.auth_server, issue_id)
 
-        return request.get(url, verify=False,
-                           auth=(self.username, self.password))
+        return request.shared_get(url, verify=False,
+                                  auth=(self.username, self.password))
 
 
 class Jira(plugin.Plugin):
@@ -22,6 +22,7 @@ from pyhole.core import utils
 
 class Launchpad(plugin.Plugin):
     """Provide access to the Launchpad API."""
+    concurrency = 2
 
     def __init__(self, session):
         self.session = session
@@ -45,6 +46,8 @@ class Launchpad(plugin.Plugin):
             else:
                 # Find everyone on the team
                 for i, person in enumerate(members.members):
+                    if plugin.cancelled():
+                        break
                     if i <= 4:
                         self._find_bugs(message, person, proj, False)
                     else:
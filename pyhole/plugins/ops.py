@@ -23,6 +23,9 @@ from pyhole.core import version
 class Ops(plugin.Plugin):
     """Manage operational responsibilities."""
 
+    # NOTE(agent): Incident replies shouldn't wait behind everyone else's.
+    priority = True
+
     def __init__(self, session):
         self.session = session
         self.name = self.__class__.__name__
@@ -43,7 +46,7 @@ class Ops(plugin.Plugin):
     def query(self, message, params=None, **kwargs):
         """Query an incident (ex: .query <ID>)."""
         url = "%s/incidents/%s" % (self.endpoint, params)
-        req = request.get(url, headers=self.api_headers)
+        req = request.shared_get(url, headers=self.api_headers)
 
         if request.ok(req):
             incident = req.json()["incident"]
@@ -134,7 +137,7 @@ class Ops(plugin.Plugin):
     def notes(self, message, params=None, **kwargs):
         """List all notes an incident (ex: .note <ID>)."""
         url = "%s/incidents/%s/notes" % (self.endpoint, params)
-        req = request.get(url, headers=self.api_headers)
+        req = request.shared_get(url, headers=self.api_headers)
 
         if request.ok(req):
             notes = req.json()["notes"]
@@ -153,7 +156,7 @@ class Ops(plugin.Plugin):
     def oncall(self, message, params=None, **kwargs):
         """Show who is on call (ex: .oncall)."""
         url = "%s/oncalls" % self.endpoint
-        req = request.get(url, headers=self.api_headers)
+        req = request.shared_get(url, headers=self.api_headers)
 
         if request.ok(req):
             on_calls = []
@@ -190,7 +193,7 @@ class Ops(plugin.Plugin):
     def services(self, message, params=None, **kwargs):
         """List PagerDuty services (ex: .services)."""
         url = "%s/services?&include[]=integrations&limit=100" % self.endpoint
-        req = request.get(url, headers=self.api_headers)
+        req = request.shared_get(url, headers=self.api_headers)
 
         if request.ok(req):
             for service in req.json()["services"]:
@@ -246,7 +249,7 @@ class Ops(plugin.Plugin):
         """Find PagerDuty user accounts."""
         url = "%s/users?query=%s&include[]=contact_methods" % (self.endpoint,
                                                                name)
-        req = request.get(url, headers=self.api_headers)
+        req = request.shared_get(url, headers=self.api_headers)
 
         if request.ok(req):
             return req.json()
@@ -43,6 +43,8 @@ class Redmine(plugin.Plugin):
         i = 0
         issues = self._find_issues(user_id)
         for i, issue in enumerate(issues):
+            if plugin.cancelled():
+                return
             if i <= 4:
                 self._find_issue(message, issue["id"])
             else:
@@ -78,7 +80,7 @@ class Redmine(plugin.Plugin):
         """Find all issues for a Redmine user."""
         url = "%s/issues.json?assigned_to_id=%s" % (
               self.redmine_url, user_id)
-        response = request.get(url)
+        response = request.shared_get(url)
         if response.status_code != 200:
                 return
 
@@ -101,7 +103,7 @@ class Redmine(plugin.Plugin):
                   self.redmine_url, offset)
         else:
             url = "%s/users.json?limit=100" % self.redmine_url
-        response = request.get(url)
+        response = request.shared_get(url)
         if response.status_code != 200:
                 return
 
@@ -110,7 +112,7 @@ class Redmine(plugin.Plugin):
     def _find_issue(self, message, issue_id):
         """Find and display a Redmine issue."""
         url = "%s/issues/%s.json" % (self.redmine_url, issue_id)
-        response = request.get(url)
+        response = request.shared_get(url)
         if response.status_code != 200:
                 return
 
@@ -59,7 +59,7 @@ class Url(plugin.Plugin):
             url = "http://" + url
 
         try:
-            response = request.get(url)
+            response = request.shared_get(url)
         except Exception:
             return
 
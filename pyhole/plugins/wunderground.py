@@ -17,6 +17,7 @@
 import pywunderground
 
 from pyhole.core import plugin
+from pyhole.core import storage
 from pyhole.core import utils
 
 
@@ -34,10 +35,14 @@ class Wunderground(plugin.Plugin):
             location = params
             if location.startswith("set "):
                 location = location[4:]
-                utils.write_file(self.name, message.source, location)
+                storage.get_namespace(self.name).put(message.source,
+                                                     location)
+                # NOTE(agent): Keep the nick index used by Distance current.
+                nick = message.source.split("!")[0]
+                storage.get_namespace("WundergroundNicks").put(nick, location)
                 message.dispatch("Location information saved.")
         else:
-            location = utils.read_file(self.name, message.source)
+            location = storage.get_namespace(self.name).get(message.source)
             if not location:
                 message.dispatch(self.wunderground.__doc__)
                 return
@@ -20,6 +20,7 @@ from BeautifulSoup import BeautifulSoup
 
 from pyhole.core import plugin
 from pyhole.core import request
+from pyhole.core import storage
 from pyhole.core import utils
 
 
@@ -43,7 +44,7 @@ class Xsa(plugin.Plugin):
 
     def _make_xsa_message(self, xsa_id, data):
         try:
-            xsa_info = data[xsa_id]
+            xsa_info = dict(data[xsa_id])
         except Exception:
             return None
         else:
@@ -62,7 +63,7 @@ class Xsa(plugin.Plugin):
             return
 
         new_data_json = json.dumps(new_data)
-        utils.write_file(self.name, "xsas.json", new_data_json)
+        storage.get_namespace(self.name).put("xsas.json", new_data_json)
 
         # Notify subscribed channels on new XSAs
         old_xsa_ids = set(old_data.keys())
@@ -86,7 +87,7 @@ class Xsa(plugin.Plugin):
                 self.irc.notice(channel, msg)
 
     def _load_cached_xsa_data(self):
-        data_json = utils.read_file(self.name, "xsas.json")
+        data_json = storage.get_namespace(self.name).get("xsas.json")
         if data_json is None:
             return {}
         return json.loads(data_json)
@@ -0,0 +1,111 @@
+#   Copyright 2026 agent
+#
+#   Licensed under the Apache License, Version 2.0 (the "License");
+#   you may not use this file except in compliance with the License.
+#   You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS,
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#   See the License for the specific language governing permissions and
+#   limitations under the License.
+
+"""Pyhole API Unit Tests"""
+
+import gzip
+import os
+import shutil
+import StringIO
+import tempfile
+import unittest
+
+from pyhole.core import api
+from pyhole.core import pastes
+from pyhole.core import storage
+from pyhole.core import version
+
+
+class TestPasteAPI(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        index = storage.SQLiteBackend(os.path.join(self.tmp_dir, "test.db"))
+        self.store = pastes.PasteStore(self.tmp_dir,
+                                       storage.Namespace(index, "Pastes"))
+        self.old_store = pastes._store
+        pastes._store = self.store
+
+        self.paste_id = self.store.create("0123456789")
+        self.digest = self.store.lookup(self.paste_id)["digest"]
+        self.url = "/pastes/%s/raw" % self.paste_id
+        self.client = api.APP.test_client()
+
+    def tearDown(self):
+        pastes._store = self.old_store
+        api.RENDERED_PASTES.discard(self.paste_id)
+        shutil.rmtree(self.tmp_dir)
+
+    def test_raw_etag(self):
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data, "0123456789")
+        self.assertEqual(response.headers["ETag"], '"%s"' % self.digest)
+        self.assertTrue("Content-Encoding" not in response.headers)
+
+    def test_raw_not_modified(self):
+        response = self.client.get(self.url, headers={
+            "If-None-Match": '"%s"' % self.digest})
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response.headers["ETag"], '"%s"' % self.digest)
+
+    def test_raw_gzip(self):
+        response = self.client.get(self.url, headers={
+            "Accept-Encoding": "gzip"})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.headers["Content-Encoding"], "gzip")
+        self.assertEqual(response.headers["ETag"], '"%s-gz"' % self.digest)
+        data = gzip.GzipFile(fileobj=StringIO.StringIO(response.data)).read()
+        self.assertEqual(data, "0123456789")
+
+        response = self.client.get(self.url, headers={
+            "Accept-Encoding": "gzip",
+            "If-None-Match": '"%s-gz"' % self.digest})
+        self.assertEqual(response.status_code, 304)
+
+    def test_range(self):
+        response = self.client.get(self.url, headers={"Range": "bytes=2-5"})
+        self.assertEqual(response.status_code, 206)
+        self.assertEqual(response.data, "2345")
+        self.assertEqual(response.headers["Content-Range"], "bytes 2-5/10")
+
+    def test_range_not_satisfiable(self):
+        response = self.client.get(self.url, headers={
+            "Range": "bytes=20-30"})
+        self.assertEqual(response.status_code, 416)
+        self.assertEqual(response.headers["Content-Range"], "bytes */10")
+
+    def test_multiple_ranges(self):
+        response = self.client.get(self.url, headers={
+            "Range": "bytes=0-1,5-6"})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data, "0123456789")
+
+    def test_html_etag(self):
+        etag = '"%s-html-%s"' % (self.digest, version.version_hash())
+        url = "/pastes/%s" % self.paste_id
+
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.headers["ETag"], etag)
+
+        response = self.client.get(url, headers={"If-None-Match": etag})
+        self.assertEqual(response.status_code, 304)
+
+        response = self.client.get(url, headers={
+            "If-None-Match": '"%s-html"' % self.digest})
+        self.assertEqual(response.status_code, 200)
+
+    def test_missing(self):
+        response = self.client.get("/pastes/%s/raw" % ("0" * 32))
+        self.assertEqual(response.status_code, 404)
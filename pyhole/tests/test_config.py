@@ -14,6 +14,9 @@
 
 """Pyhole Config Unit Tests"""
 
+import os
+import shutil
+import tempfile
 import unittest
 
 from pyhole.core import config
@@ -35,6 +38,10 @@ class TestConfig(unittest.TestCase):
         test_int = self.config.get("reconnect_delay", type="int")
         self.assertTrue(isinstance(test_int, int))
 
+    def test_get_float(self):
+        test_float = self.config.get("poll_jitter", type="float")
+        self.assertTrue(isinstance(test_float, float))
+
     def test_get_bool(self):
         test_bool = self.config.get("debug", type="bool")
         self.assertTrue(isinstance(test_bool, bool))
@@ -46,3 +53,57 @@ class TestConfig(unittest.TestCase):
     def test_get_str(self):
         test_str = self.config.get("command_prefix")
         self.assertTrue(isinstance(test_str, str))
+
+
+class TestConfigCache(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.path = os.path.join(self.tmp_dir, "pyhole.conf")
+        self._write("[Pyhole]\nadmins = a, b\ndelay = 1\n", 100)
+
+    def tearDown(self):
+        config.reload()
+        shutil.rmtree(self.tmp_dir)
+
+    def _write(self, data, mtime):
+        with open(self.path, "w") as conf_file:
+            conf_file.write(data)
+        os.utime(self.path, (mtime, mtime))
+
+    def test_view_is_cached(self):
+        self.assertTrue(config.get_config(self.path, "Pyhole") is
+                        config.get_config(self.path, "Pyhole"))
+
+    def test_list_is_copied(self):
+        view = config.get_config(self.path, "Pyhole")
+        view.get("admins", type="list").append("c")
+        self.assertEqual(view.get("admins", type="list"), ["a", "b"])
+
+    def test_reload_on_mtime(self):
+        view = config.get_config(self.path, "Pyhole")
+        self.assertEqual(view.get("delay", type="int"), 1)
+
+        self._write("[Pyhole]\ndelay = 2\n", 100)
+        config.CHECK_INTERVAL, interval = 0, config.CHECK_INTERVAL
+        try:
+            self.assertEqual(view.get("delay", type="int"), 1)
+
+            os.utime(self.path, (200, 200))
+            self.assertEqual(view.get("delay", type="int"), 2)
+        finally:
+            config.CHECK_INTERVAL = interval
+
+    def test_reload(self):
+        view = config.get_config(self.path, "Pyhole")
+        self.assertEqual(view.get("delay", type="int"), 1)
+
+        self._write("[Pyhole]\ndelay = 2\n", 100)
+        config.reload()
+        self.assertEqual(view.get("delay", type="int"), 2)
+
+    def test_reload_while_locked(self):
+        view = config.get_config(self.path, "Pyhole")
+        self._write("[Pyhole]\ndelay = 2\n", 100)
+        with config._lock:
+            config.reload()
+        self.assertEqual(view.get("delay", type="int"), 2)
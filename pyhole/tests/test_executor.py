@@ -0,0 +1,184 @@
+#   Copyright 2026 agent
+#
+#   Licensed under the Apache License, Version 2.0 (the "License");
+#   you may not use this file except in compliance with the License.
+#   You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS,
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#   See the License for the specific language governing permissions and
+#   limitations under the License.
+
+"""Pyhole Executor Unit Tests"""
+
+import threading
+import time
+import unittest
+
+from pyhole.core import executor
+
+
+class FakeMessage(object):
+    def __init__(self):
+        self.replies = []
+
+    def dispatch(self, reply):
+        self.replies.append(reply)
+
+
+class TestExecutor(unittest.TestCase):
+    def setUp(self):
+        self.pool = executor.Executor("test", workers=1, queue_size=1)
+        self.started = threading.Event()
+        self.release = threading.Event()
+
+    def tearDown(self):
+        self.release.set()
+
+    def _block(self):
+        self.started.set()
+        self.release.wait(5)
+
+    def test_submit(self):
+        done = threading.Event()
+        self.assertTrue(self.pool.submit(done.set))
+        self.assertTrue(done.wait(5))
+
+    def test_saturation_drop(self):
+        self.assertTrue(self.pool.submit(self._block))
+        self.assertTrue(self.started.wait(5))
+        self.assertTrue(self.pool.submit(self._block))
+        self.assertFalse(self.pool.submit(self._block))
+        self.assertEqual(self.pool.stats()["dropped"], 1)
+
+    def test_unknown_policy(self):
+        pool = executor.Executor("test", policy="foo")
+        self.assertEqual(pool.policy, "drop")
+
+    def test_get_executor(self):
+        pool = executor.get_executor("Pyhole")
+        self.assertTrue(pool is executor.get_executor("Pyhole"))
+
+
+class TestBulkhead(unittest.TestCase):
+    def setUp(self):
+        self.pool = executor.Executor("test", workers=2, queue_size=4)
+        self.bulkhead = executor.Bulkhead("Test", limit=1, backlog=1)
+        self.started = threading.Event()
+        self.release = threading.Event()
+
+    def tearDown(self):
+        self.release.set()
+
+    def _block(self):
+        self.started.set()
+        self.release.wait(5)
+
+    def test_limit(self):
+        done = threading.Event()
+        self.assertTrue(self.bulkhead.submit(self.pool, self._block))
+        self.assertTrue(self.started.wait(5))
+        self.assertTrue(self.bulkhead.submit(self.pool, done.set))
+        self.assertFalse(self.bulkhead.submit(self.pool, done.set))
+        self.assertEqual(self.bulkhead.stats()["shed"], 1)
+        self.assertEqual(self.bulkhead.stats()["waiting"], 1)
+
+        self.release.set()
+        self.assertTrue(done.wait(5))
+
+    def test_other_work_not_starved(self):
+        done = threading.Event()
+        self.assertTrue(self.bulkhead.submit(self.pool, self._block))
+        self.assertTrue(self.started.wait(5))
+        self.assertTrue(self.pool.submit(done.set))
+        self.assertTrue(done.wait(5))
+
+
+class TestDeadline(unittest.TestCase):
+    def setUp(self):
+        executor.WATCHDOG_INTERVAL = 0.01
+        self.pool = executor.Executor("test", workers=1, queue_size=4)
+        self.release = threading.Event()
+
+    def tearDown(self):
+        self.release.set()
+        executor.WATCHDOG_INTERVAL = 0.5
+
+    def test_no_deadline(self):
+        deadline = executor.Deadline("test", 0)
+        self.assertEqual(deadline.remaining(), None)
+        self.assertFalse(deadline.cancelled())
+
+    def test_cancel(self):
+        deadline = executor.Deadline("test", 60)
+        self.assertTrue(deadline.cancel())
+        self.assertFalse(deadline.cancel())
+        self.assertTrue(deadline.cancelled())
+
+    def test_timed_out_worker_is_replaced(self):
+        cancelled = threading.Event()
+        done = threading.Event()
+
+        def _hang():
+            while not executor.current_deadline().cancelled():
+                self.release.wait(0.01)
+            cancelled.set()
+            self.release.wait(5)
+
+        executor.set_deadline(executor.Deadline("test", 0.05))
+        try:
+            self.assertTrue(self.pool.submit(_hang))
+        finally:
+            executor.set_deadline(None)
+
+        self.assertTrue(cancelled.wait(5))
+        self.assertTrue(self.pool.submit(done.set))
+        self.assertTrue(done.wait(5))
+
+    def test_timed_out_while_queued(self):
+        message = FakeMessage()
+        called = []
+        deadline = executor.Deadline("test", 0.01, message, reply=True)
+        time.sleep(0.02)
+
+        self.assertTrue(executor.run_call(called.append, (1,), {}, deadline,
+                                          deadline.log))
+        self.assertEqual(called, [])
+        self.assertEqual(message.replies, ["Sorry, test timed out."])
+
+    def test_replacements_are_capped(self):
+        stuck = []
+        done = threading.Event()
+
+        def _hang():
+            stuck.append(1)
+            self.release.wait(5)
+
+        for timeout in (0.1, 0.2):
+            executor.set_deadline(executor.Deadline("test", timeout))
+            try:
+                self.assertTrue(self.pool.submit(_hang))
+            finally:
+                executor.set_deadline(None)
+
+        for _i in range(500):
+            if self.pool.stats()["stuck"] == 2:
+                break
+            time.sleep(0.01)
+        self.assertEqual(len(stuck), 2)
+        self.assertEqual(len(self.pool._threads), 2)
+
+        self.assertTrue(self.pool.submit(done.set))
+        self.assertFalse(done.wait(0.1))
+
+        self.release.set()
+        self.assertTrue(done.wait(5))
+        for _i in range(500):
+            if not self.pool.stats()["stuck"]:
+                break
+            time.sleep(0.01)
+        self.assertEqual(self.pool.stats()["stuck"], 0)
+        self.assertEqual(len(self.pool._threads), 1)
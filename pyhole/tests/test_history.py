@@ -0,0 +1,90 @@
+#   Copyright 2026 agent
+#
+#   Licensed under the Apache License, Version 2.0 (the "License");
+#   you may not use this file except in compliance with the License.
+#   You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS,
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#   See the License for the specific language governing permissions and
+#   limitations under the License.
+
+"""Pyhole History Unit Tests"""
+
+import logging
+import os
+import shutil
+import tempfile
+import unittest
+
+from pyhole.core import history
+
+
+class TestHistoryIndex(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.index = history.HistoryIndex(os.path.join(self.tmp_dir,
+                                                       "history.db"))
+        self.index.add_many([
+            ("FreeNode", 1.0, "-#pyhole- <alice> the build is broken",
+             "#pyhole"),
+            ("FreeNode", 2.0, "-#pyhole- <bob> which build?", "#pyhole"),
+            ("FreeNode", 3.0, "<bob> my build password", None),
+            ("EFnet", 4.0, "-#other- <carol> broken again", "#other")
+        ])
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp_dir)
+
+    def test_search(self):
+        self.assertEqual(self.index.search("FreeNode", "build"),
+                         [(3.0, "<bob> my build password"),
+                          (2.0, "-#pyhole- <bob> which build?"),
+                          (1.0, "-#pyhole- <alice> the build is broken")])
+        self.assertEqual(self.index.search("FreeNode", "broken", limit=1),
+                         [(1.0, "-#pyhole- <alice> the build is broken")])
+
+    def test_search_channel(self):
+        self.assertEqual(self.index.search("FreeNode", "build",
+                                           channel="#pyhole"),
+                         [(2.0, "-#pyhole- <bob> which build?"),
+                          (1.0, "-#pyhole- <alice> the build is broken")])
+        self.assertEqual(self.index.search("FreeNode", "build",
+                                           channel="#other"), [])
+
+    def test_channel_case(self):
+        self.index.add_many([("FreeNode", 5.0, "-#PyHole- <dave> build it",
+                              "#PyHole")])
+        self.assertEqual(len(self.index.search("FreeNode", "build",
+                                               channel="#PYHOLE")), 3)
+        self.assertEqual(self.index.last("FreeNode", 1, "#pyhole"),
+                         [(5.0, "-#PyHole- <dave> build it")])
+
+    def test_search_invalid_query(self):
+        self.assertEqual(self.index.search("FreeNode", 'which"',
+                                           channel="#pyhole"),
+                         [(2.0, "-#pyhole- <bob> which build?")])
+
+    def test_last(self):
+        self.assertEqual(self.index.last("EFnet"),
+                         [(4.0, "-#other- <carol> broken again")])
+        self.assertEqual(self.index.last("FreeNode", 1, "#pyhole"),
+                         [(2.0, "-#pyhole- <bob> which build?")])
+
+    def test_handler(self):
+        handler = history.HistoryHandler("EFnet", self.index)
+        handler.handle(logging.makeLogRecord({"msg": "-#other- <%s> hi",
+                                              "args": ("dave",),
+                                              "created": 5.0}))
+        handler.handle(logging.makeLogRecord({"msg": "<dave> psst",
+                                              "created": 6.0}))
+        self.assertEqual(len(self.index.last("EFnet")), 1)
+
+        handler.flush_batch()
+        self.assertEqual(self.index.last("EFnet", limit=2),
+                         [(6.0, "<dave> psst"), (5.0, "-#other- <dave> hi")])
+        self.assertEqual(self.index.last("EFnet", 1, "#other"),
+                         [(5.0, "-#other- <dave> hi")])
@@ -14,7 +14,13 @@
 
 """Pyhole Log Unit Tests"""
 
+import bz2
+import gzip
+import logging
 import os
+import shutil
+import tempfile
+import threading
 import unittest
 
 from pyhole.core import logger
@@ -38,3 +44,131 @@ class TestLogger(unittest.TestCase):
         self.assertEqual(test_log.level, 0)
 
         os.unlink(test_log_dir + "test.log")
+
+
+class ListHandler(logging.Handler):
+    def __init__(self):
+        logging.Handler.__init__(self)
+        self.messages = []
+        self.started = None
+
+    def emit(self, record):
+        self.messages.append(self.format(record))
+        if self.started:
+            self.started.set()
+            self.unblock.wait(5)
+
+
+class TestLogWriter(unittest.TestCase):
+    def setUp(self):
+        self.writer = logger.LogWriter(queue_size=10)
+        self.target = ListHandler()
+        self.log = logging.getLogger("test_writer")
+        self.log.propagate = False
+        self.log.addHandler(logger.QueueHandler([self.target], self.writer))
+
+    def tearDown(self):
+        self.log.handlers = []
+
+    def test_write(self):
+        args = ["a"]
+        self.log.warning("hello %s", args)
+        args.append("b")
+        self.writer.flush()
+        self.assertEqual(self.target.messages, ["hello ['a']"])
+
+    def test_drop(self):
+        self.writer.queue_size = 1
+        self.target.started = threading.Event()
+        self.target.unblock = threading.Event()
+
+        self.log.warning("a")
+        self.target.started.wait(5)
+        self.log.warning("b")
+        self.log.warning("c")
+        self.target.unblock.set()
+        self.writer.flush()
+
+        self.assertEqual(self.writer.dropped, 1)
+        self.assertEqual(self.target.messages,
+                         ["a", "Dropped 1 log records", "b"])
+
+        self.log.warning("d")
+        self.writer.flush()
+        self.assertEqual(self.target.messages[-1], "d")
+        self.assertEqual(self.writer._queue.unfinished_tasks, 0)
+
+
+class TestArchiver(unittest.TestCase):
+    def setUp(self):
+        self.log_dir = tempfile.mkdtemp()
+        self.archive_dir = os.path.join(self.log_dir, "archive")
+
+    def tearDown(self):
+        shutil.rmtree(self.log_dir)
+
+    def _write(self, filename, data="log line\n"):
+        with open(os.path.join(self.log_dir, filename), "w") as log_file:
+            log_file.write(data)
+
+    def _archiver(self, codec):
+        return logger.Archiver(codec, 1, log_dir=self.log_dir,
+                               archive_dir=self.archive_dir)
+
+    def test_archive_gz(self):
+        self._write("freenode.log")
+        self._write("freenode.log.2016-01-01")
+        self._write("freenode.log.2016-01-02")
+        self._archiver("gz").archive()
+
+        self.assertEqual(sorted(os.listdir(self.log_dir)),
+                         ["archive", "freenode.log"])
+        archived = os.path.join(self.archive_dir, "freenode",
+                                "freenode.log.2016-01-02.gz")
+        self.assertEqual(gzip.open(archived).read(), "log line\n")
+
+    def test_archive_bz2(self):
+        self._write("efnet.log.2016-01-01")
+        self._archiver("bz2").archive()
+
+        archived = os.path.join(self.archive_dir, "efnet",
+                                "efnet.log.2016-01-01.bz2")
+        self.assertEqual(bz2.BZ2File(archived).read(), "log line\n")
+
+    def test_failed_codec(self):
+        self._write("efnet.log.2016-01-01")
+        archiver = self._archiver("gz")
+        open_archive = archiver._open
+
+        def _open(path):
+            output = open_archive(path)
+            output.write("partial")
+
+            def _write(data):
+                raise IOError("disk full")
+
+            output.write = _write
+            return output
+
+        archiver._open = _open
+        archiver.archive()
+
+        self.assertEqual(sorted(os.listdir(self.log_dir)),
+                         ["archive", "efnet.log.2016-01-01"])
+        self.assertEqual(os.listdir(os.path.join(self.archive_dir, "efnet")),
+                         [])
+
+    def test_skips_live_claims(self):
+        self._write("efnet.log.2016-01-01.claimed-%d" % os.getppid())
+        self._archiver("bz2").archive()
+        self.assertFalse(os.path.exists(self.archive_dir))
+
+    def test_takes_over_dead_claims(self):
+        pid = os.fork()
+        if not pid:
+            os._exit(0)
+        os.waitpid(pid, 0)
+
+        self._write("efnet.log.2016-01-01.claimed-%d" % pid)
+        self._archiver("bz2").archive()
+        self.assertEqual(os.listdir(self.log_dir), ["archive"])
@@ -0,0 +1,80 @@
+#   Copyright 2026 agent
+#
+#   Licensed under the Apache License, Version 2.0 (the "License");
+#   you may not use this file except in compliance with the License.
+#   You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS,
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#   See the License for the specific language governing permissions and
+#   limitations under the License.
+
+"""Pyhole Log Search Unit Tests"""
+
+import bz2
+import gzip
+import os
+import shutil
+import tempfile
+import unittest
+
+from pyhole.core import logsearch
+
+
+class TestLogSearch(unittest.TestCase):
+    def setUp(self):
+        self.archive_dir = tempfile.mkdtemp()
+        network_dir = os.path.join(self.archive_dir, "freenode")
+        os.makedirs(network_dir)
+
+        archives = [
+            ("freenode.log.2016-01-02.bz2", bz2.BZ2File,
+             ["10:00:00 [FreeNode] second day", "10:00:01 [FreeNode] skip"]),
+            ("freenode.log.2016-01-01.gz", gzip.open,
+             ["09:00:00 [FreeNode] first day", "09:00:01 [FreeNode] Day"]),
+            ("freenode.log.2016-01-03.bz2", bz2.BZ2File,
+             ["11:00:00 [FreeNode] third day"]),
+            ("freenode.log.2016-01-04", open, ["12:00:00 not archived day"])
+        ]
+        for filename, opener, lines in archives:
+            archive = opener(os.path.join(network_dir, filename), "wb")
+            archive.write("\n".join(lines) + "\n")
+            archive.close()
+
+    def tearDown(self):
+        shutil.rmtree(self.archive_dir)
+
+    def _search(self, *args, **kwargs):
+        kwargs["archive_dir"] = self.archive_dir
+        return list(logsearch.search("FreeNode", *args, **kwargs))
+
+    def test_list_archives(self):
+        archives = logsearch.list_archives("FreeNode", self.archive_dir)
+        self.assertEqual([date for date, _path in archives],
+                         ["2016-01-01", "2016-01-02", "2016-01-03"])
+        self.assertEqual(logsearch.list_archives("EFnet", self.archive_dir),
+                         [])
+
+    def test_list_archives_mixed_case(self):
+        self.assertEqual(logsearch.list_archives("FREEnode", self.archive_dir),
+                         logsearch.list_archives("freenode", self.archive_dir))
+        self.assertEqual(len(logsearch.list_archives("FREEnode",
+                                                     self.archive_dir)), 3)
+
+    def test_search(self):
+        self.assertEqual(self._search("day", processes=2), [
+            ("2016-01-01", "09:00:00 [FreeNode] first day"),
+            ("2016-01-02", "10:00:00 [FreeNode] second day"),
+            ("2016-01-03", "11:00:00 [FreeNode] third day")])
+
+    def test_search_ignore_case(self):
+        self.assertEqual(len(self._search("day", processes=1,
+                                          ignore_case=True)), 4)
+
+    def test_search_limit(self):
+        self.assertEqual(self._search(r"\bday", limit=2, processes=2), [
+            ("2016-01-01", "09:00:00 [FreeNode] first day"),
+            ("2016-01-02", "10:00:00 [FreeNode] second day")])
@@ -0,0 +1,124 @@
+#   Copyright 2026 agent
+#
+#   Licensed under the Apache License, Version 2.0 (the "License");
+#   you may not use this file except in compliance with the License.
+#   You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS,
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#   See the License for the specific language governing permissions and
+#   limitations under the License.
+
+"""Pyhole IRC Message Unit Tests"""
+
+import logging
+import unittest
+
+from pyhole.core import utils
+from pyhole.core.irc import message
+
+
+class FakeSession(object):
+    def __init__(self, userhost=None):
+        self.log = logging.getLogger("test")
+        self.nick = "pyhole"
+        self.userhost = userhost
+        self.addressed = False
+        self.sent = []
+
+    def reply(self, target, msg):
+        self.sent.append(("PRIVMSG", target, msg))
+
+    def notice(self, target, msg):
+        self.sent.append(("NOTICE", target, msg))
+
+
+class TestMessage(unittest.TestCase):
+    def setUp(self):
+        self.session = FakeSession()
+        self.max_lines = utils.get_config().get("reply_max_lines",
+                                                type="int", default=10)
+
+    def _relayed(self, userhost=None):
+        """Return each sent line as the server relays it."""
+        userhost = userhost or "u" * message.MAX_USER_LENGTH + "@" + (
+            "h" * message.MAX_HOST_LENGTH)
+        lines = []
+        for command, target, msg in self.session.sent:
+            if isinstance(msg, unicode):
+                msg = msg.encode("utf-8")
+            lines.append(":%s!%s %s %s :%s\r\n" % (self.session.nick,
+                                                   userhost, command, target,
+                                                   msg))
+        return lines
+
+    def _assert_fits(self, userhost=None):
+        lines = self._relayed(userhost)
+        self.assertTrue(lines)
+        for line in lines:
+            self.assertTrue(len(line) <= message.MAX_LINE_BYTES, len(line))
+
+    def test_line_budget(self):
+        budget = message.line_budget(self.session, "PRIVMSG", "#pyhole")
+        self.assertEqual(budget, 512 - 74 - len(":pyhole! PRIVMSG #pyhole "
+                                                ":\r\n"))
+
+        self.session.userhost = "bot@example.org"
+        budget = message.line_budget(self.session, "PRIVMSG", "#pyhole")
+        self.assertEqual(budget, 512 - 15 - len(":pyhole! PRIVMSG #pyhole "
+                                                ":\r\n"))
+
+    def test_privmsg_prefix(self):
+        reply = message.Reply(self.session, "", "nick!ident@host", "#pyhole")
+        reply.dispatch("x" * 1000)
+        self.assertEqual(len(self.session.sent), 3)
+        self.assertEqual("".join(x[2] for x in self.session.sent),
+                         "x" * 1000)
+        self._assert_fits()
+
+    def test_known_userhost(self):
+        self.session.userhost = "bot@example.org"
+        reply = message.Reply(self.session, "", "nick!ident@host", "#pyhole")
+        reply.dispatch("word " * 300)
+        self._assert_fits("bot@example.org")
+        self.assertTrue(len(self._relayed("bot@example.org")[0]) > 500)
+
+    def test_addressed_prefix(self):
+        self.session.addressed = True
+        reply = message.Reply(self.session, "", "somenick!ident@host",
+                              "#pyhole")
+        reply.dispatch("y" * 1000)
+        for _command, _target, msg in self.session.sent:
+            self.assertTrue(msg.startswith("somenick: "))
+        self._assert_fits()
+
+    def test_notice(self):
+        notice = message.Notice(self.session, "", "#pyhole")
+        notice.dispatch("z" * 1000)
+        self.assertEqual(self.session.sent[0][0], "NOTICE")
+        self._assert_fits()
+
+    def test_multibyte_boundary(self):
+        text = u"\u2603" * 400
+        reply = message.Reply(self.session, "", "nick!ident@host", "#pyhole")
+        reply.dispatch(text)
+        self.assertTrue(len(self.session.sent) > 1)
+        self.assertEqual(u"".join(x[2] for x in self.session.sent), text)
+        self._assert_fits()
+
+    def test_max_lines(self):
+        reply = message.Reply(self.session, "", "nick!ident@host", "#pyhole")
+        reply.dispatch("\n".join(str(x) for x in range(self.max_lines * 2)))
+        self.assertEqual(len(self.session.sent), self.max_lines)
+        self.assertEqual(self.session.sent[-2][2], str(self.max_lines - 2))
+        self.assertEqual(self.session.sent[-1][2], "...")
+
+    def test_max_lines_long_line(self):
+        reply = message.Reply(self.session, "", "nick!ident@host", "#pyhole")
+        reply.dispatch("x" * 500 * self.max_lines)
+        self.assertEqual(len(self.session.sent), self.max_lines)
+        self.assertEqual(self.session.sent[-1][2], "...")
+        self._assert_fits()
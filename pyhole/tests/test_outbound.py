@@ -0,0 +1,99 @@
+#   Copyright 2026 agent
+#
+#   Licensed under the Apache License, Version 2.0 (the "License");
+#   you may not use this file except in compliance with the License.
+#   You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS,
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#   See the License for the specific language governing permissions and
+#   limitations under the License.
+
+"""Pyhole Outbound IRC Scheduler Unit Tests"""
+
+import threading
+import unittest
+
+from pyhole.core.irc import outbound
+
+
+class TestOutboundScheduler(unittest.TestCase):
+    def setUp(self):
+        self.scheduler = outbound.OutboundScheduler(None, burst=2, rate=0.5,
+                                                    max_queued=5)
+        self.now = self.scheduler._stamp
+
+    def _drain(self, now):
+        lines = []
+        while True:
+            item, wait = self.scheduler.next_line(now)
+            if item is None:
+                return lines, wait
+            lines.append(item)
+
+    def test_burst_then_rate(self):
+        for i in range(4):
+            self.scheduler.put("privmsg", "#pyhole", "line %d" % i)
+
+        lines, wait = self._drain(self.now)
+        self.assertEqual([x[2] for x in lines], ["line 0", "line 1"])
+        self.assertAlmostEqual(wait, 2.0)
+
+        lines, wait = self._drain(self.now + 2)
+        self.assertEqual([x[2] for x in lines], ["line 2"])
+
+    def test_round_robin(self):
+        for i in range(3):
+            self.scheduler.put("privmsg", "#busy", "busy %d" % i)
+        self.scheduler.put("privmsg", "#quiet", "quiet")
+
+        lines, _wait = self._drain(self.now + 10)
+        self.assertEqual([x[1] for x in lines], ["#busy", "#quiet"])
+        lines, _wait = self._drain(self.now + 14)
+        self.assertEqual([x[1] for x in lines], ["#busy", "#busy"])
+
+    def test_priority(self):
+        self.scheduler.put("privmsg", "#pyhole", "normal")
+        self.scheduler.put("notice", "admin", "urgent", priority=True)
+
+        lines, _wait = self._drain(self.now)
+        self.assertEqual(lines, [("notice", "admin", "urgent"),
+                                 ("privmsg", "#pyhole", "normal")])
+
+    def test_max_queued(self):
+        for i in range(6):
+            self.scheduler.put("privmsg", "#pyhole", "line %d" % i)
+        self.assertEqual(len(self.scheduler), 5)
+        self.assertEqual(self.scheduler.stats()["dropped"], 1)
+
+        self.assertEqual(self.scheduler.clear(), 5)
+        self.assertEqual(len(self.scheduler), 0)
+
+    def test_stats(self):
+        self.scheduler.put("privmsg", "#pyhole", "line")
+        self.scheduler.put("privmsg", "#other", "line", priority=True)
+        stats = self.scheduler.stats()
+        self.assertEqual((stats["queued"], stats["priority"],
+                          stats["targets"]), (2, 1, 2))
+
+        self._drain(self.now + 3)
+        stats = self.scheduler.stats()
+        self.assertEqual((stats["queued"], stats["sent"]), (0, 2))
+        self.assertTrue(2.5 < stats["wait_max"] <= 3)
+
+    def test_sends(self):
+        sent = []
+        done = threading.Event()
+
+        def send(kind, target, line):
+            sent.append((kind, target, line))
+            done.set()
+
+        scheduler = outbound.OutboundScheduler(send)
+        scheduler.start()
+        scheduler.put("privmsg", "#pyhole", "hello")
+        self.assertTrue(done.wait(5))
+        self.assertEqual(sent, [("privmsg", "#pyhole", "hello")])
@@ -0,0 +1,138 @@
+#   Copyright 2026 agent
+#
+#   Licensed under the Apache License, Version 2.0 (the "License");
+#   you may not use this file except in compliance with the License.
+#   You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS,
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#   See the License for the specific language governing permissions and
+#   limitations under the License.
+
+"""Pyhole Paste Store Unit Tests"""
+
+import os
+import shutil
+import tempfile
+import unittest
+
+from pyhole.core import pastes
+from pyhole.core import storage
+
+
+class TestPasteStore(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        index = storage.SQLiteBackend(os.path.join(self.tmp_dir, "test.db"))
+        self.store = pastes.PasteStore(self.tmp_dir,
+                                       storage.Namespace(index, "Pastes"))
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp_dir)
+
+    def test_create_and_read(self):
+        paste_id = self.store.create(u"hello \u2603\n")
+        record = self.store.lookup(paste_id)
+        self.assertEqual(self.store.read(record), "hello \xe2\x98\x83\n")
+        self.assertEqual(record["size"], 10)
+
+    def test_sharded_path(self):
+        record = self.store.lookup(self.store.create("foo"))
+        digest = record["digest"]
+        self.assertEqual(self.store.object_path(digest),
+                         os.path.join(self.tmp_dir, "objects", digest[:2],
+                                      digest[2:4], digest + ".gz"))
+        self.assertTrue(os.path.exists(self.store.object_path(digest)))
+
+    def test_dedup(self):
+        first = self.store.lookup(self.store.create("same"))
+        second = self.store.lookup(self.store.create("same"))
+        self.assertNotEqual(first["id"], second["id"])
+        self.assertEqual(first["digest"], second["digest"])
+
+    def test_legacy_paste(self):
+        paste_id = "0123456789abcdef0123456789abcdef"
+        with open(os.path.join(self.tmp_dir, paste_id), "w") as paste_file:
+            paste_file.write("old paste")
+
+        record = self.store.lookup(paste_id)
+        self.assertEqual(self.store.read(record), "old paste")
+        self.assertFalse(os.path.exists(os.path.join(self.tmp_dir,
+                                                     paste_id)))
+        self.assertEqual(self.store.lookup(paste_id), record)
+
+    def test_lookup_invalid(self):
+        self.assertEqual(self.store.lookup("../pyhole.conf"), None)
+        self.assertEqual(self.store.lookup("0" * 32), None)
+
+    def test_stream(self):
+        record = self.store.lookup(self.store.create("0123456789"))
+        self.assertEqual("".join(self.store.stream(record)), "0123456789")
+        self.assertEqual("".join(self.store.stream(record, 2, 5)), "234")
+
+    def test_compact_ttl(self):
+        old_id = self.store.create("old")
+        new_id = self.store.create("new")
+
+        now = self.store.lookup(new_id)["created"]
+        self.store._accessed[new_id] = now + 30
+        self.assertEqual(self.store.compact(ttl=60, now=now + 61), [old_id])
+        self.assertEqual(self.store.lookup(old_id), None)
+        self.assertNotEqual(self.store.lookup(new_id), None)
+
+    def test_compact_max_count(self):
+        ids = [self.store.create(str(i)) for i in range(3)]
+        self.store.touch(ids[0])
+        self.assertEqual(self.store.compact(max_count=2), [ids[1]])
+
+    def test_compact_keeps_shared_blobs(self):
+        first = self.store.create("same")
+        second = self.store.create("same")
+        self.store.touch(second)
+        digest = self.store.lookup(first)["digest"]
+
+        self.assertEqual(self.store.compact(max_count=1), [first])
+        self.assertTrue(os.path.exists(self.store.object_path(digest)))
+
+        self.assertEqual(self.store.compact(max_bytes=1), [second])
+        self.assertFalse(os.path.exists(self.store.object_path(digest)))
+
+    def test_compact_keeps_blobs_of_new_pastes(self):
+        old_id = self.store.create("same")
+        digest = self.store.lookup(old_id)["digest"]
+        new_ids = []
+
+        delete = self.store.index.delete
+
+        def create_during_compaction(paste_id):
+            delete(paste_id)
+            if not new_ids:
+                new_ids.append(self.store.create("same"))
+
+        self.store.index.delete = create_during_compaction
+        self.assertEqual(self.store.compact(max_count=0, max_bytes=1),
+                         [old_id])
+        self.assertTrue(os.path.exists(self.store.object_path(digest)))
+        self.assertEqual(self.store.read(self.store.lookup(new_ids[0])),
+                         "same")
+
+
+class TestRenderCache(unittest.TestCase):
+    def test_evicts_least_recently_used(self):
+        cache = pastes.RenderCache(10)
+        cache.put("a", "aaaa")
+        cache.put("b", "bbbb")
+        cache.get("a")
+        cache.put("c", "cccc")
+        self.assertEqual(cache.get("b"), None)
+        self.assertEqual(cache.get("a"), "aaaa")
+        self.assertEqual(cache.bytes, 8)
+
+    def test_too_large(self):
+        cache = pastes.RenderCache(10)
+        cache.put("a", "a" * 11)
+        self.assertEqual(cache.get("a"), None)
+        self.assertEqual(cache.bytes, 0)
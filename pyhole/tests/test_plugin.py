@@ -0,0 +1,264 @@
+#   Copyright 2026 agent
+#
+#   Licensed under the Apache License, Version 2.0 (the "License");
+#   you may not use this file except in compliance with the License.
+#   You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS,
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#   See the License for the specific language governing permissions and
+#   limitations under the License.
+
+"""Pyhole Plugin Unit Tests"""
+
+import logging
+import os
+import shutil
+import sys
+import tempfile
+import unittest
+
+from pyhole.core import executor
+from pyhole.core import manifest
+from pyhole.core import plugin
+from pyhole.core import ratelimit
+
+
+class FakeSession(object):
+    def __init__(self):
+        self.log = logging.getLogger("test")
+        self.command_prefix = "."
+        self.nick = "pyhole"
+        self.addressed = False
+        self.calls = []
+
+
+class FakeMessage(object):
+    def __init__(self, message, source="nick!ident"):
+        self.message = message
+        self.source = source
+
+
+class TestPlugin(unittest.TestCase):
+    def setUp(self):
+        self.plugin_classes = plugin.Plugin._plugin_classes
+        plugin.Plugin._plugin_classes = []
+        plugin._reset_variables()
+
+        class Example(plugin.Plugin):
+            @plugin.hook_add_command("test")
+            def test(self, message, params=None, **kwargs):
+                self.session.calls.append(("test", params,
+                                           kwargs["addressed"]))
+
+            @plugin.hook_add_keyword("lp")
+            def keyword_lp(self, message, params=None, **kwargs):
+                self.session.calls.append(("lp", params))
+
+            @plugin.hook_add_keyword("lpx")
+            def keyword_lpx(self, message, params=None, **kwargs):
+                self.session.calls.append(("lpx", params))
+
+            @plugin.hook_add_msg_regex("(https?://|www.)[^ ]+")
+            def regex_match_url(self, message, match, **kwargs):
+                self.session.calls.append(("url", match.group(0)))
+
+        self.session = FakeSession()
+        plugin._init_plugins(self.session)
+
+        self.limiter = ratelimit._limiter
+        ratelimit._limiter = ratelimit.RateLimiter(0, 0, 0)
+
+    def tearDown(self):
+        plugin.Plugin._plugin_classes = self.plugin_classes
+        plugin._reset_variables()
+        ratelimit._limiter = self.limiter
+
+    def _poll(self, msg, private=False):
+        plugin.poll_messages(self.session, FakeMessage(msg), private)
+        return self.session.calls
+
+    def test_command_index(self):
+        self.assertEqual(plugin._registry.commands.keys(), ["test"])
+
+    def test_command(self):
+        self.assertEqual(self._poll(".test"), [("test", None, False)])
+
+    def test_command_params(self):
+        self.assertEqual(self._poll(".TEST foo bar"),
+                         [("test", "foo bar", False)])
+
+    def test_command_addressed(self):
+        self.assertEqual(self._poll("pyhole:  test foo"),
+                         [("test", "foo", True)])
+
+    def test_command_private(self):
+        self.assertEqual(self._poll("test foo", private=True),
+                         [("test", "foo", False)])
+
+    def test_command_no_match(self):
+        self.assertEqual(self._poll(".testing"), [])
+        self.assertEqual(self._poll("test"), [])
+
+    def test_keyword(self):
+        self.assertEqual(self._poll("see LP123 and lp45"),
+                         [("lp", "123"), ("lp", "45")])
+
+    def test_keyword_all_prefixes(self):
+        self.assertEqual(self._poll("lpx9"), [("lp", "x9"), ("lpx", "9")])
+
+    def test_keyword_line_break(self):
+        self.assertEqual(self._poll("lp1\nmore"), [("lp", "1")])
+
+    def test_keyword_word_start(self):
+        self.assertEqual(self._poll("help lp help1 lp"), [])
+
+    def test_msg_regex(self):
+        self.assertEqual(self._poll("see HTTP://example.com now"),
+                         [("url", "HTTP://example.com")])
+
+    def test_msg_regex_no_match(self):
+        self.assertEqual(self._poll("nothing to see here"), [])
+
+    def test_required_literals(self):
+        self.assertEqual(plugin._required_literals("(https?://|www.)[^ ]+"),
+                         ("http", "www"))
+        self.assertEqual(plugin._required_literals("[A-Z]{2}-[0-9]{3,5}"),
+                         ("-",))
+        self.assertEqual(plugin._required_literals("a|b*"), None)
+
+    def test_reload_plugins_keeps_unchanged(self):
+        old_registry = plugin._registry
+        old_instance = old_registry.instances[0]
+
+        import_plugins = plugin._import_plugins
+        plugin._import_plugins = lambda reload_changed=False: (
+            set([__name__]), {})
+        try:
+            plugin.reload_plugins(self.session)
+        finally:
+            plugin._import_plugins = import_plugins
+
+        self.assertFalse(plugin._registry is old_registry)
+        self.assertTrue(plugin._registry.instances[0] is old_instance)
+        self.assertEqual(self._poll(".test"), [("test", None, False)])
+
+    def test_rate_limited(self):
+        ratelimit._limiter = ratelimit.RateLimiter(0, 0, 2)
+        self._poll(".test 1")
+        self._poll(".test 2")
+        self._poll(".test 3")
+        self.assertEqual(self._poll("lp1"), [("test", "1", False),
+                                             ("test", "2", False),
+                                             ("lp", "1")])
+        self.assertEqual(ratelimit._limiter.limited, 1)
+
+    def test_rate_limit_commands_only(self):
+        ratelimit._limiter = ratelimit.RateLimiter(1, 0, 0)
+        self._poll("lp1 http://example.com")
+        self._poll("lp2 http://example.org")
+        self.assertEqual(len(self.session.calls), 4)
+
+        self._poll(".test 1")
+        self._poll(".test 2")
+        self.assertEqual(self.session.calls[4:], [("test", "1", False)])
+
+    def test_rate_limit_admin_exempt(self):
+        ratelimit._limiter = ratelimit.RateLimiter(1, 0, 0)
+        self.session.admins = ["nick!ident"]
+        self.assertEqual(len(self._poll(".test")), 1)
+        self.assertEqual(len(self._poll(".test")), 2)
+
+    def test_deadline_priority(self):
+        instance = plugin._registry.instances[0]
+        message = FakeMessage(".test")
+        self.assertFalse(plugin._build_deadline(self.session, instance.test,
+                                                message).priority)
+
+        self.session.admins = ["nick!ident"]
+        self.assertTrue(plugin._build_deadline(self.session, instance.test,
+                                               message).priority)
+
+        self.session.admins = []
+        instance.priority = True
+        self.assertTrue(plugin._build_deadline(self.session, instance.test,
+                                               message).priority)
+
+    def test_manifest_describe(self):
+        entry = manifest.describe("abc", plugin.Plugin._plugin_classes,
+                                  plugin._hook_names)
+        self.assertTrue(entry["lazy"])
+        hooks = entry["classes"][0]["hooks"]
+        self.assertEqual(sorted((x["type"], x["arg"]) for x in hooks),
+                         [("command", "test"), ("keyword", "lp"),
+                          ("keyword", "lpx"),
+                          ("msg_regex", "(https?://|www.)[^ ]+")])
+
+    def test_lazy_plugin_loads_on_first_use(self):
+        entry = manifest.describe("abc", plugin.Plugin._plugin_classes,
+                                  plugin._hook_names)
+        instances = plugin._create_lazy_instances({__name__: entry},
+                                                  self.session)
+        plugin._registry = plugin.Registry(instances)
+        self.assertTrue(isinstance(plugin._registry.instances[0],
+                                   plugin.LazyPlugin))
+        self.assertEqual(plugin.active_plugins(), "Example")
+
+        self._poll(".test foo")
+        executor.get_executor("test")._queue.join()
+        self.assertEqual(self.session.calls, [("test", "foo", False)])
+        self.assertFalse(isinstance(plugin._registry.instances[0],
+                                    plugin.LazyPlugin))
+        self.assertEqual(self._poll("lp1"), [("test", "foo", False),
+                                             ("lp", "1")])
+
+    def test_lazy_plugin_load_after_reload(self):
+        entry = manifest.describe("abc", plugin.Plugin._plugin_classes,
+                                  plugin._hook_names)
+        stand_in = plugin._create_lazy_instances({__name__: entry},
+                                                 self.session)[0]
+        plugin._registry = plugin.Registry([stand_in])
+
+        # A reload published a new registry while the stand-in loaded
+        registry = plugin._registry = plugin.Registry([])
+        stand_in._load()
+        self.assertTrue(plugin._registry is registry)
+
+    def test_import_plugin_reloads_changed(self):
+        plugin_dir = tempfile.mkdtemp()
+        plugin_file = os.path.join(plugin_dir, "pyhole_test_reload.py")
+        sys.path.append(plugin_dir)
+
+        try:
+            with open(plugin_file, "w") as f:
+                f.write("VALUE = 1\n")
+            mtime = int(os.path.getmtime(plugin_file))
+            os.utime(plugin_file, (mtime, mtime))
+            module = plugin._import_plugin("pyhole_test_reload",
+                                           ["pyhole_test_reload"])
+            self.assertEqual(module.VALUE, 1)
+
+            with open(plugin_file, "w") as f:
+                f.write("VALUE = 2\n")
+            os.utime(plugin_file, (mtime, mtime))
+            if os.path.exists(plugin_file + "c"):
+                os.unlink(plugin_file + "c")
+
+            module = plugin._import_plugin("pyhole_test_reload",
+                                           ["pyhole_test_reload"],
+                                           reload_changed=True)
+            self.assertEqual(module.VALUE, 1)
+
+            mtime += 10
+            os.utime(plugin_file, (mtime, mtime))
+            module = plugin._import_plugin("pyhole_test_reload",
+                                           ["pyhole_test_reload"],
+                                           reload_changed=True)
+            self.assertEqual(module.VALUE, 2)
+        finally:
+            sys.path.remove(plugin_dir)
+            sys.modules.pop("pyhole_test_reload", None)
+            shutil.rmtree(plugin_dir)
@@ -0,0 +1,92 @@
+#   Copyright 2026 agent
+#
+#   Licensed under the Apache License, Version 2.0 (the "License");
+#   you may not use this file except in compliance with the License.
+#   You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS,
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#   See the License for the specific language governing permissions and
+#   limitations under the License.
+
+"""Pyhole Network Process Unit Tests"""
+
+import multiprocessing
+import os
+import select
+import signal
+import sys
+import time
+import types
+import unittest
+
+from pyhole.core import irc
+from pyhole.core import process
+
+
+class FakeConfig(object):
+    def get(self, key, **kwargs):
+        return kwargs.get("default")
+
+
+class FakeClient(object):
+    """A reactor that waits in select() until a line arrives."""
+
+    ready = None
+    read_fd = None
+
+    def __init__(self, network):
+        self.network = network
+
+    def start(self):
+        FakeClient.ready.set()
+        while True:
+            readable, _w, _x = select.select([FakeClient.read_fd], [], [])
+            if readable:
+                os.read(FakeClient.read_fd, 1)
+                return
+
+
+class TestProcess(unittest.TestCase):
+    def setUp(self):
+        self.read_fd, self.write_fd = os.pipe()
+        FakeClient.ready = multiprocessing.Event()
+        FakeClient.read_fd = self.read_fd
+
+        module = types.ModuleType("pyhole.core.irc.client")
+        module.Client = FakeClient
+        self.client = sys.modules.get("pyhole.core.irc.client")
+        sys.modules["pyhole.core.irc.client"] = irc.client = module
+
+        self.get_config = process.utils.get_config
+        process.utils.get_config = lambda *args: FakeConfig()
+
+    def tearDown(self):
+        process.utils.get_config = self.get_config
+        if self.client:
+            sys.modules["pyhole.core.irc.client"] = irc.client = self.client
+        else:
+            del sys.modules["pyhole.core.irc.client"], irc.client
+        os.close(self.read_fd)
+        os.close(self.write_fd)
+
+    def test_sighup_keeps_reactor_running(self):
+        proc = process.Process("FreeNode")
+        proc.start()
+        try:
+            self.assertTrue(FakeClient.ready.wait(5))
+            time.sleep(0.1)
+
+            os.kill(proc.pid, signal.SIGHUP)
+            time.sleep(0.1)
+            self.assertTrue(proc.is_alive())
+
+            os.write(self.write_fd, "x")
+            proc.join(5)
+            self.assertEqual(proc.exitcode, 0)
+        finally:
+            if proc.is_alive():
+                proc.terminate()
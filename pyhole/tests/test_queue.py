@@ -0,0 +1,79 @@
+#   Copyright 2026 agent
+#
+#   Licensed under the Apache License, Version 2.0 (the "License");
+#   you may not use this file except in compliance with the License.
+#   You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS,
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#   See the License for the specific language governing permissions and
+#   limitations under the License.
+
+"""Pyhole Message Queue Unit Tests"""
+
+import logging
+import multiprocessing
+import threading
+import unittest
+
+from pyhole.core import queue
+
+
+class FakeSession(object):
+    def __init__(self, network):
+        self.log = logging.getLogger(network)
+        self.replies = []
+        self.replied = threading.Event()
+
+    def reply(self, target, msg):
+        self.replies.append((target, msg))
+        self.replied.set()
+
+
+class TestMessageBroker(unittest.TestCase):
+    def setUp(self):
+        self.broker = queue.MessageBroker(["FreeNode", "EFnet"])
+
+    def test_routing(self):
+        self.assertTrue(self.broker.put(("EFnet", "#pyhole", "one")))
+        self.assertTrue(self.broker.put(("FreeNode", "#pyhole", "two")))
+        self.assertEqual(self.broker.stats(), {"FreeNode": 1, "EFnet": 1,
+                                               "unroutable": 0})
+
+        self.assertEqual(self.broker.get("FreeNode"),
+                         ("FreeNode", "#pyhole", "two"))
+        self.assertEqual(self.broker.stats()["FreeNode"], 0)
+        self.assertEqual(self.broker.stats()["EFnet"], 1)
+
+    def test_unroutable(self):
+        self.assertFalse(self.broker.put(("Undernet", "#pyhole", "lost")))
+        self.assertEqual(self.broker.stats()["unroutable"], 1)
+
+    def test_unroutable_other_process(self):
+        proc = multiprocessing.Process(target=self.broker.put,
+                                       args=(("Undernet", "#pyhole", "x"),))
+        proc.start()
+        proc.join(5)
+        self.assertEqual(self.broker.stats()["unroutable"], 1)
+
+    def test_watch(self):
+        session = FakeSession("FreeNode")
+        self.broker.watch(session)
+        self.broker.put(("FreeNode", "#pyhole", "hello"))
+        self.assertTrue(session.replied.wait(5))
+        self.assertEqual(session.replies, [("#pyhole", "hello")])
+
+    def test_watch_once_per_network(self):
+        first = FakeSession("FreeNode")
+        second = FakeSession("FreeNode")
+        threads = threading.active_count()
+        self.broker.watch(first)
+        self.broker.watch(second)
+        self.assertEqual(threading.active_count(), threads + 1)
+
+        self.broker.put(("FreeNode", "#pyhole", "hello"))
+        self.assertTrue(second.replied.wait(5))
+        self.assertEqual(first.replies, [])
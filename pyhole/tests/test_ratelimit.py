@@ -0,0 +1,55 @@
+#   Copyright 2026 agent
+#
+#   Licensed under the Apache License, Version 2.0 (the "License");
+#   you may not use this file except in compliance with the License.
+#   You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS,
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#   See the License for the specific language governing permissions and
+#   limitations under the License.
+
+"""Pyhole Rate Limiting Unit Tests"""
+
+import unittest
+
+from pyhole.core import ratelimit
+
+
+class TestRateLimiter(unittest.TestCase):
+    def setUp(self):
+        self.limiter = ratelimit.RateLimiter(user_limit=2, channel_limit=3,
+                                             command_limit=0, period=10)
+
+    def test_user_limit(self):
+        self.assertTrue(self.limiter.allow("a", "#c", "cmd", now=100))
+        self.assertTrue(self.limiter.allow("a", "#c", "cmd", now=100))
+        self.assertFalse(self.limiter.allow("a", "#c", "cmd", now=100))
+        self.assertEqual(self.limiter.limited, 1)
+
+    def test_refill(self):
+        self.limiter.allow("a", "#c", "cmd", now=100)
+        self.limiter.allow("a", "#c", "cmd", now=100)
+        self.assertTrue(self.limiter.allow("a", "#c", "cmd", now=105))
+
+    def test_channel_limit(self):
+        self.assertTrue(self.limiter.allow("a", "#c", "cmd", now=100))
+        self.assertTrue(self.limiter.allow("b", "#c", "cmd", now=100))
+        self.assertTrue(self.limiter.allow("c", "#c", "cmd", now=100))
+        self.assertFalse(self.limiter.allow("d", "#c", "cmd", now=100))
+        self.assertTrue(self.limiter.allow("d", None, "cmd", now=100))
+
+    def test_refused_calls_are_not_charged(self):
+        for source in ("a", "b", "c"):
+            self.limiter.allow(source, "#c", "cmd", now=100)
+        self.assertFalse(self.limiter.allow("d", "#c", "cmd", now=100))
+        self.assertEqual(self.limiter.stats()["user"], 3)
+
+    def test_expire(self):
+        self.limiter.allow("a", "#c", "cmd", now=100)
+        self.limiter.allow("b", "#c", "cmd", now=150)
+        self.assertEqual(self.limiter.stats(), {"limited": 0, "user": 1,
+                                                "channel": 1})
@@ -0,0 +1,64 @@
+#   Copyright 2026 agent
+#
+#   Licensed under the Apache License, Version 2.0 (the "License");
+#   you may not use this file except in compliance with the License.
+#   You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS,
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#   See the License for the specific language governing permissions and
+#   limitations under the License.
+
+"""Pyhole Request Unit Tests"""
+
+import threading
+import time
+import unittest
+
+from pyhole.core import request
+
+
+class TestSingleFlight(unittest.TestCase):
+    def test_concurrent_callers_share_result(self):
+        started = threading.Event()
+        release = threading.Event()
+        calls = []
+        results = []
+
+        def fetch():
+            calls.append(1)
+            started.set()
+            release.wait(5)
+            return object()
+
+        def call():
+            results.append(request.single_flight("key", fetch))
+
+        leader = threading.Thread(target=call)
+        leader.start()
+        started.wait(5)
+
+        followers = [threading.Thread(target=call) for _i in range(3)]
+        for t in followers:
+            t.start()
+        time.sleep(0.1)
+        release.set()
+
+        for t in [leader] + followers:
+            t.join(5)
+
+        self.assertEqual(len(calls), 1)
+        self.assertEqual(len(results), 4)
+        self.assertTrue(all(x is results[0] for x in results))
+        self.assertEqual(request._flights, {})
+
+    def test_error_is_shared_and_cleared(self):
+        def fail():
+            raise ValueError("boom")
+
+        self.assertRaises(ValueError, request.single_flight, "key", fail)
+        self.assertEqual(request._flights, {})
+        self.assertEqual(request.single_flight("key", lambda: 1), 1)
@@ -0,0 +1,73 @@
+#   Copyright 2026 agent
+#
+#   Licensed under the Apache License, Version 2.0 (the "License");
+#   you may not use this file except in compliance with the License.
+#   You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS,
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#   See the License for the specific language governing permissions and
+#   limitations under the License.
+
+"""Pyhole Scheduler Unit Tests"""
+
+import threading
+import time
+import unittest
+
+from pyhole.core import executor
+from pyhole.core import scheduler
+
+
+class TestScheduler(unittest.TestCase):
+    def setUp(self):
+        self.pool = executor.Executor("test", workers=2, queue_size=4)
+        self.scheduler = scheduler.Scheduler(jitter=0)
+        self.release = threading.Event()
+
+    def tearDown(self):
+        self.release.set()
+
+    def test_poll(self):
+        runs = []
+        done = threading.Event()
+
+        def _poll():
+            runs.append(time.time())
+            if len(runs) == 3:
+                done.set()
+
+        poll = self.scheduler.add("test", _poll, 0.01, self.pool)
+        self.assertTrue(done.wait(5))
+        poll.cancel()
+
+    def test_cancel(self):
+        runs = []
+        started = threading.Event()
+
+        def _poll():
+            runs.append(1)
+            started.set()
+
+        poll = self.scheduler.add("test", _poll, 0.01, self.pool)
+        self.assertTrue(started.wait(5))
+        poll.cancel()
+        count = len(runs)
+        time.sleep(0.05)
+        self.assertTrue(len(runs) <= count + 1)
+
+    def test_skip_overlapping(self):
+        started = threading.Event()
+
+        def _poll():
+            started.set()
+            self.release.wait(5)
+
+        poll = self.scheduler.add("test", _poll, 0.01, self.pool)
+        self.assertTrue(started.wait(5))
+        time.sleep(0.05)
+        poll.cancel()
+        self.assertTrue(poll.skipped > 0)
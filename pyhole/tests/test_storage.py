@@ -0,0 +1,108 @@
+#   Copyright 2026 agent
+#
+#   Licensed under the Apache License, Version 2.0 (the "License");
+#   you may not use this file except in compliance with the License.
+#   You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS,
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#   See the License for the specific language governing permissions and
+#   limitations under the License.
+
+"""Pyhole Storage Unit Tests"""
+
+import os
+import shutil
+import tempfile
+import threading
+import unittest
+
+from pyhole.core import storage
+from pyhole.core import utils
+
+
+class TestSQLiteBackend(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.store = storage.SQLiteBackend(os.path.join(self.tmp_dir,
+                                                        "test.db"))
+        self.namespace = storage.Namespace(self.store, "pyhole_test_ns")
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp_dir)
+        shutil.rmtree(utils.get_directory("pyhole_test_ns"))
+
+    def test_get_put(self):
+        self.assertEqual(self.namespace.get("nick!ident"), None)
+        self.namespace.put("nick!ident", "Austin, TX ")
+        self.assertEqual(self.namespace.get("nick!ident"), "Austin, TX")
+
+    def test_delete(self):
+        self.namespace.put("a", "1")
+        self.namespace.delete("a")
+        self.assertEqual(self.namespace.get("a"), None)
+
+    def test_scan(self):
+        self.namespace.put_many([("b!1", "x"), ("a!1", "y"), ("b!2", "z")])
+        self.assertEqual(self.namespace.scan(),
+                         [("a!1", "y"), ("b!1", "x"), ("b!2", "z")])
+        self.assertEqual(self.namespace.scan("b!"),
+                         [("b!1", "x"), ("b!2", "z")])
+
+    def test_namespaces_are_separate(self):
+        other = storage.Namespace(self.store, "pyhole_test_other")
+        self.namespace.put("a", "1")
+        self.assertEqual(other.get("a"), None)
+        shutil.rmtree(utils.get_directory("pyhole_test_other"))
+
+    def test_threads_share_data(self):
+        thread = threading.Thread(target=self.namespace.put,
+                                  args=("a", "1"))
+        thread.start()
+        thread.join()
+        self.assertEqual(self.namespace.get("a"), "1")
+
+    def test_migrate_files(self):
+        utils.write_file("pyhole_test_files", "nick!ident", "Austin, TX")
+        try:
+            namespace = storage.Namespace(self.store, "pyhole_test_files")
+            self.assertEqual(namespace.get("nick!ident"), "Austin, TX")
+
+            namespace.put("nick!ident", "Dallas, TX")
+            namespace = storage.Namespace(self.store, "pyhole_test_files")
+            self.assertEqual(namespace.get("nick!ident"), "Dallas, TX")
+        finally:
+            shutil.rmtree(utils.get_directory("pyhole_test_files"))
+
+    def test_cached_namespace(self):
+        self.namespace.put("a", "1")
+        cached = storage.Namespace(self.store, "pyhole_test_ns", cached=True)
+        self.assertEqual(cached.cache, {"a": "1"})
+
+        cached.put("b", "2")
+        self.assertEqual(cached.cache["b"], "2")
+        self.assertEqual(self.namespace.get("b"), "2")
+
+        self.namespace.put("c", "3")
+        self.assertEqual(cached.get("c"), "3")
+        self.assertEqual(cached.scan(), [("a", "1"), ("b", "2"), ("c", "3")])
+
+    def test_cached_namespace_sees_other_processes(self):
+        self.namespace.put("nick", "Austin, TX")
+        cached = storage.Namespace(self.store, "pyhole_test_ns", cached=True)
+
+        other = storage.SQLiteBackend(self.store.path)
+        other.put("pyhole_test_ns", "nick", "Dallas, TX")
+        self.assertEqual(cached.get("nick"), "Austin, TX")
+
+        storage.CHECK_INTERVAL, interval = 0, storage.CHECK_INTERVAL
+        try:
+            self.assertEqual(cached.get("nick"), "Dallas, TX")
+
+            other.delete("pyhole_test_ns", "nick")
+            self.assertEqual(cached.scan(), [])
+        finally:
+            storage.CHECK_INTERVAL = interval
@@ -33,6 +33,21 @@ class TestUtils(unittest.TestCase):
         test_str = "<foo>&#64;&amp;bar&amp;&#64;</foo>"
         self.assertEqual(utils.decode_entities(test_str), "@&bar&@")
 
+    def test_split_utf8(self):
+        self.assertEqual(utils.split_utf8("short", 10), ["short"])
+        self.assertEqual(utils.split_utf8("one two three four", 10),
+                         ["one two", "three four"])
+        self.assertEqual(utils.split_utf8("abcdefghijkl", 5),
+                         ["abcde", "fghij", "kl"])
+
+    def test_split_utf8_characters(self):
+        text = u"\u2603" * 5
+        chunks = utils.split_utf8(text, 7)
+        self.assertEqual(chunks, [u"\u2603\u2603", u"\u2603\u2603",
+                                  u"\u2603"])
+        self.assertEqual(utils.split_utf8(text.encode("utf-8"), 7),
+                         [x.encode("utf-8") for x in chunks])
+
     def test_ensure_int(self):
         self.assertEqual(utils.ensure_int("3"), 3)
 
@@ -50,6 +65,11 @@ class TestUtils(unittest.TestCase):
         conf_file = utils.get_option("config")
         self.assertTrue(conf_file.endswith("pyhole.conf"))
 
+    def test_get_options_memoized(self):
+        options = utils.get_options()
+        self.assertTrue(options is utils.get_options())
+        self.assertRaises(AttributeError, setattr, options, "debug", True)
+
     def test_get_home_directory(self):
         self.assertTrue(utils.get_home_directory().endswith("/.pyhole/"))
 
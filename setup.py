@@ -52,7 +52,8 @@ setuptools.setup(
     packages=setuptools.find_packages(),
     entry_points={
         "console_scripts": [
-            "pyhole = pyhole.main:Main"
+            "pyhole = pyhole.main:Main",
+            "pyhole-logsearch = pyhole.core.logsearch:main"
         ]
     }
 )
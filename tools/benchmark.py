@@ -0,0 +1,135 @@
+#!/usr/bin/env python
+
+#   Copyright 2026 agent
+#
+#   Licensed under the Apache License, Version 2.0 (the "License");
+#   you may not use this file except in compliance with the License.
+#   You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS,
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#   See the License for the specific language governing permissions and
+#   limitations under the License.
+
+"""Pyhole Micro Benchmarks
+
+Usage: python tools/benchmark.py [keywords] [options]
+"""
+
+import argparse
+import logging
+import sys
+import timeit
+
+from pyhole.core import plugin
+from pyhole.core import utils
+
+
+MESSAGE = ("has anyone looked at lp1234567 yet? it looks like the same "
+           "thing as rm4242 and xsa-123 from last week")
+
+
+class FakeSession(object):
+    def __init__(self):
+        self.log = logging.getLogger("benchmark")
+        self.command_prefix = "."
+        self.nick = "pyhole"
+        self.addressed = False
+
+
+class FakeMessage(object):
+    def __init__(self, message):
+        self.message = message
+        self.source = "nick!ident"
+
+
+def _register_keywords(count):
+    """Register a plugin with the given number of keyword hooks."""
+    plugin.Plugin._plugin_classes = []
+    plugin._reset_variables()
+
+    attrs = {}
+    for i in range(count):
+        attrs["keyword_%d" % i] = plugin.hook_add_keyword("kw%d" % i)(
+            lambda self, message, params=None, **kwargs: None)
+
+    type("Benchmark", (plugin.Plugin,), attrs)
+    plugin._init_plugins(FakeSession())
+
+
+def keywords():
+    """Time run_keyword_hooks as the number of keywords grows."""
+    session = FakeSession()
+    message = FakeMessage(MESSAGE)
+
+    print "%10s %15s" % ("keywords", "usec/message")
+    for count in (1, 10, 100, 1000):
+        _register_keywords(count)
+        timer = timeit.Timer(lambda: plugin.run_keyword_hooks(
+                             session, message, False))
+        runs = 10000
+        usec = min(timer.repeat(3, runs)) / runs * 1000000
+        print "%10d %15.2f" % (count, usec)
+
+
+def _count_parsers(func):
+    """Return how many argument parsers func builds."""
+    count = [0]
+    init = argparse.ArgumentParser.__init__
+
+    def counting_init(self, *args, **kwargs):
+        count[0] += 1
+        init(self, *args, **kwargs)
+
+    argparse.ArgumentParser.__init__ = counting_init
+    try:
+        func()
+    finally:
+        argparse.ArgumentParser.__init__ = init
+
+    return count[0]
+
+
+def _startup():
+    """Look up options the way a network process does while starting."""
+    utils.debug_enabled()
+    for section in ("Pyhole", "FreeNode") * 10:
+        utils.get_config(section)
+
+
+def options():
+    """Count the option parsers built during startup, before and after
+    the options were memoized.
+    """
+    get_options = utils.get_options
+    utils.get_options = lambda: utils.Options(**vars(utils.build_options()))
+    try:
+        before = _count_parsers(_startup)
+    finally:
+        utils.get_options = get_options
+
+    utils._options = None
+    after = _count_parsers(_startup)
+
+    print "%10s %10s %12s" % ("before", "after", "eliminated")
+    print "%10d %10d %12d" % (before, after, before - after)
+
+
+BENCHMARKS = {
+    "keywords": keywords,
+    "options": options,
+}
+
+
+def main():
+    names = sys.argv[1:] or sorted(BENCHMARKS)
+    for name in names:
+        print "== %s ==" % name
+        BENCHMARKS[name]()
+
+
+if __name__ == "__main__":
+    main()